@@ -0,0 +1,138 @@
+# 异步(ASGI)服务: 用 asyncio 驱动牌局并推送 SSE, 回合之间的等待不占用线程,
+# 一个进程可以同时服务大量观战连接; 牌局逻辑和 Flask 版本共用 engine.Game
+# 运行: uvicorn asgi_server:app --port 5000
+import asyncio
+import json
+import mimetypes
+import os
+from urllib.parse import parse_qs
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from engine import Game
+from replay import Replay, ReplayStore
+from metrics import metrics
+from streams import TURN_DELAY, metered_events
+from tables import TableRegistry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+templates = Environment(loader=FileSystemLoader(os.path.join(BASE_DIR, 'templates')),
+                        autoescape=select_autoescape(['html']))
+templates.globals['url_for'] = lambda endpoint, filename: f"/static/{filename}"
+
+tables = TableRegistry(Game)
+replays = ReplayStore(os.path.join(BASE_DIR, 'replays'))
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    path = scope['path']
+    query = {key: values[0] for key, values in parse_qs(scope['query_string'].decode()).items()}
+    if path == '/':
+        await index(query, send)
+    elif path == '/play':
+        await play(query, receive, send)
+    elif path == '/replay':
+        await replay(query, send)
+    elif path == '/metrics':
+        await respond(send, 200, metrics.render([('active_tables', len(tables))]).encode(),
+                      b'text/plain; version=0.0.4')
+    elif path.startswith('/static/'):
+        await static(path[len('/static/'):], send)
+    else:
+        await respond(send, 404, b'Not Found')
+
+
+async def respond(send, status, body, content_type=b'text/plain; charset=utf-8'):
+    await send({'type': 'http.response.start', 'status': status, 'headers': [(b'content-type', content_type)]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def index(query, send):
+    table_id, game = tables.get_or_create(query.get('table'))
+    game.reset_game()
+    html = templates.get_template('index.html').render(game_state=game.get_game_state(), table_id=table_id)
+    await respond(send, 200, html.encode(), b'text/html; charset=utf-8')
+
+
+async def static(name, send):
+    path = os.path.normpath(os.path.join(STATIC_DIR, name))
+    if not path.startswith(STATIC_DIR + os.sep) or not os.path.isfile(path):
+        await respond(send, 404, b'Not Found')
+        return
+    with open(path, 'rb') as f:
+        body = f.read()
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    await respond(send, 200, body, content_type.encode())
+
+
+async def replay(query, send):
+    replay_id = query.get('id')
+    if replay_id:
+        game_replay = replays.get(replay_id)
+    else:
+        game = tables.get(query.get('table'))
+        game_replay = Replay.from_game(game) if game is not None and game.game_over else None
+        replay_id = replays.put(game_replay) if game_replay is not None else None
+    if game_replay is None:
+        await respond(send, 404, b'Not Found')
+        return
+    try:
+        turn = int(query.get('turn', 0))
+    except ValueError:
+        turn = 0
+    turn = max(0, min(turn, len(game_replay) - 1))
+    body = json.dumps({'id': replay_id, 'turn': turn, 'turns': len(game_replay) - 1, 'state': game_replay.frame(turn)})
+    await respond(send, 200, body.encode(), b'application/json')
+
+
+async def play(query, receive, send):
+    table_id = query.get('table')
+    game = tables.get(table_id)
+    if game is None:
+        await respond(send, 404, b'Not Found')
+        return
+
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache')]})
+
+    # 浏览器关闭连接时立刻停止推送
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        disconnected.set()
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    try:
+        for event in metered_events(game, query.get('delta') == '1'):
+            tables.touch(table_id)
+            await send({'type': 'http.response.body', 'body': event.encode(), 'more_body': True})
+            if game.game_over:
+                continue
+            try:
+                await asyncio.wait_for(disconnected.wait(), TURN_DELAY)
+                return
+            except asyncio.TimeoutError:
+                pass
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        watcher.cancel()
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, port=5000)
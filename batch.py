@@ -0,0 +1,190 @@
+# NumPy 批量引擎: N 局牌同时进行, 每局手牌保存为 N×4×16 的点数计数张量和 N×4×4×13 的花色平面,
+# 发牌, 合法出牌掩码和简单的出牌策略都是对所有牌局一起做的数组运算
+# 这里只模拟按点数成组的出法 (单张, 对子, 三张, 炸弹), 用于大批量统计
+import time
+
+import numpy as np
+
+from cards import DECK, NUM_RANKS, SUITS, WILD_CARD
+
+HAND_SIZE = 25
+SEATS = 4
+
+# 计数张量的列按大小排列: 0~12 为 2~A, 13 为任意牌, 14 小王, 15 大王; 列号就是单张/对子的大小
+WILD_COLUMN = NUM_RANKS
+NUM_COLUMNS = NUM_RANKS + 3
+
+DECK_IDS = np.array([card.id for card in DECK] * 2, dtype=np.int16)       # 两副牌 108 张
+CARD_COLUMN = np.zeros(WILD_CARD.id + 1, dtype=np.int64)
+CARD_SUIT = np.full(WILD_CARD.id + 1, -1, dtype=np.int64)
+for _card in DECK:
+    if _card.rank_index < NUM_RANKS:
+        CARD_COLUMN[_card.id] = _card.rank_index
+        CARD_SUIT[_card.id] = _card.suit_index
+CARD_COLUMN[DECK[-2].id] = NUM_RANKS + 1
+CARD_COLUMN[DECK[-1].id] = NUM_RANKS + 2
+CARD_COLUMN[WILD_CARD.id] = WILD_COLUMN
+
+# 发牌顺序和 Game.deal_cards 一致: 从牌堆末尾依次发给四个座位, 每人 25 张
+DEAL_POSITIONS = np.array([[len(DECK_IDS) - 1 - (seat + SEATS * i) for i in range(HAND_SIZE)] for seat in range(SEATS)])
+
+LEAD, SINGLE, PAIR, TRIO, BOMB = 0, 1, 2, 3, 4
+
+
+def shuffle_decks(n, rng):
+    # 每局随机一个级牌, 把两张红桃级牌换成任意牌, 再各自洗牌; 返回 (N×108 牌 id, N 个级牌下标)
+    levels = rng.integers(0, NUM_RANKS, size=n)
+    decks = np.tile(DECK_IDS, (n, 1))
+    heart_level = (levels * len(SUITS) + SUITS.index('♥'))[:, None]
+    decks[decks == heart_level] = WILD_CARD.id
+    return rng.permuted(decks, axis=1), levels
+
+
+def deal(n, rng):
+    decks, levels = shuffle_decks(n, rng)
+    hands = decks[:, DEAL_POSITIONS]                     # N×4×25 牌 id
+    return hands, levels
+
+
+def count_tensor(hands):
+    # N×4×25 牌 id -> N×4×16 点数计数
+    n = hands.shape[0]
+    slots = np.arange(n * SEATS).reshape(n, SEATS, 1) * NUM_COLUMNS
+    flat = (slots + CARD_COLUMN[hands]).ravel()
+    return np.bincount(flat, minlength=n * SEATS * NUM_COLUMNS).reshape(n, SEATS, NUM_COLUMNS)
+
+
+def suit_planes(hands):
+    # N×4×25 牌 id -> N×4×4×13 每个花色每个点数的张数 (大小王和任意牌不计)
+    n = hands.shape[0]
+    suits = CARD_SUIT[hands]
+    natural = suits >= 0
+    slots = np.broadcast_to(np.arange(n * SEATS).reshape(n, SEATS, 1), hands.shape)
+    flat = (slots * len(SUITS) + suits) * NUM_RANKS + CARD_COLUMN[hands]
+    planes = np.bincount(flat[natural], minlength=n * SEATS * len(SUITS) * NUM_RANKS)
+    return planes.reshape(n, SEATS, len(SUITS), NUM_RANKS)
+
+
+def follow_masks(hand, last_type, last_key, last_size):
+    # 跟牌的合法掩码 (N×16): 同种牌型且更大的点数, 以及能压住上家的炸弹 (整组打出)
+    columns = np.arange(NUM_COLUMNS)
+    t = last_type[:, None]
+    groupable = (t < TRIO) | (columns < NUM_RANKS)
+    same = (t >= SINGLE) & (t < BOMB) & (hand >= t) & (columns > last_key[:, None]) & groupable
+    bigger_bomb = (t < BOMB) | (hand > last_size[:, None]) | ((hand == last_size[:, None]) & (columns > last_key[:, None]))
+    bombs = (hand >= 4) & (columns < NUM_RANKS) & bigger_bomb
+    return same, bombs
+
+
+class BatchGames:
+    def __init__(self, n, seed=None):
+        self.rng = np.random.default_rng(seed)
+        hands, self.levels = deal(n, self.rng)
+        self._start(count_tensor(hands), suit_planes(hands))
+
+    @classmethod
+    def from_position(cls, counts, suits, current=0, last_type=LEAD, last_key=-1, last_size=0, last_player=0, passes=0):
+        # 从给定的局面开始 (比如搜索时抽样出的各家手牌), 标量参数对所有牌局相同
+        games = cls.__new__(cls)
+        games.rng = None
+        games.levels = None
+        games._start(counts, suits, current, last_type, last_key, last_size, last_player, passes)
+        return games
+
+    def _start(self, counts, suits, current=0, last_type=LEAD, last_key=-1, last_size=0, last_player=0, passes=0):
+        n = len(counts)
+        self.counts = counts
+        self.suits = suits
+        self.n = n
+        self.current = np.full(n, current, dtype=np.int64)
+        self.last_type = np.full(n, last_type, dtype=np.int64)
+        self.last_key = np.full(n, last_key, dtype=np.int64)
+        self.last_size = np.full(n, last_size, dtype=np.int64)
+        self.last_player = np.full(n, last_player, dtype=np.int64)
+        self.passes = np.full(n, passes, dtype=np.int64)
+        self.turns = np.zeros(n, dtype=np.int64)
+        self.winner = np.full(n, -1, dtype=np.int64)
+
+    def step(self):
+        # 所有未结束的牌局各走一回合, 返回仍在进行的局数
+        active = np.flatnonzero(self.winner < 0)
+        if not len(active):
+            return 0
+        seat = self.current[active]
+        hand = self.counts[active, seat]
+        leading = self.last_type[active] == LEAD
+
+        # 首家: 出点数最小的一组牌, 四张及以上就是炸弹
+        lead_rank = np.argmax(hand > 0, axis=1)
+        lead_count = hand[np.arange(len(active)), lead_rank]
+
+        # 跟牌: 优先用最小的同种牌型压, 否则用最小的炸弹
+        same, bombs = follow_masks(hand, self.last_type[active], self.last_key[active], self.last_size[active])
+        has_same = same.any(axis=1)
+        has_bomb = bombs.any(axis=1)
+        follow_rank = np.where(has_same, np.argmax(same, axis=1), np.argmax(bombs, axis=1))
+        follow_count = np.where(has_same, self.last_type[active],
+                                hand[np.arange(len(active)), follow_rank])
+
+        rank = np.where(leading, lead_rank, follow_rank)
+        count = np.where(leading, lead_count, np.where(has_same | has_bomb, follow_count, 0))
+        plays = count > 0
+
+        games = active[plays]
+        self._remove(games, seat[plays], rank[plays], count[plays])
+        self.last_type[games] = np.where(count[plays] >= 4, BOMB, count[plays])
+        self.last_key[games] = rank[plays]
+        self.last_size[games] = count[plays]
+        self.last_player[games] = seat[plays]
+        self.passes[games] = 0
+        emptied = self.counts[games, seat[plays]].sum(axis=1) == 0
+        self.winner[games[emptied]] = seat[plays][emptied]
+
+        passed = active[~plays]
+        self.passes[passed] += 1
+        self.turns[active] += 1
+        self.current[active] = (seat + 1) % SEATS
+
+        # 其他三家都pass, 一轮结束, 由最后出牌的玩家重新出牌
+        reset = passed[self.passes[passed] == SEATS - 1]
+        self.last_type[reset] = LEAD
+        self.last_key[reset] = -1
+        self.last_size[reset] = 0
+        self.passes[reset] = 0
+        self.current[reset] = self.last_player[reset]
+        return int((self.winner < 0).sum())
+
+    def _remove(self, games, seats, ranks, counts):
+        self.counts[games, seats, ranks] -= counts
+        # 花色平面按 ♠♥♣♦ 的顺序扣除
+        natural = ranks < NUM_RANKS
+        games, seats, ranks, remaining = games[natural], seats[natural], ranks[natural], counts[natural].copy()
+        for suit in range(len(SUITS)):
+            taken = np.minimum(remaining, self.suits[games, seats, suit, ranks])
+            self.suits[games, seats, suit, ranks] -= taken
+            remaining -= taken
+
+    def run(self, max_turns=2000, deadline=None):
+        # deadline 是 time.perf_counter() 的时刻, 到时还没打完的牌局 winner 为 -1
+        for i in range(max_turns):
+            if not self.step():
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return {'winner': self.winner, 'team': np.where(self.winner >= 0, self.winner % 2, -1), 'turns': self.turns}
+
+
+def simulate_batch(n_games, seed=None, max_turns=2000):
+    return BatchGames(n_games, seed).run(max_turns)
+
+
+if __name__ == '__main__':
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    start = time.perf_counter()
+    results = simulate_batch(n, seed=0)
+    elapsed = time.perf_counter() - start
+    finished = results['winner'] >= 0
+    print(f"{n} games in {elapsed:.2f}s ({n / elapsed:.0f} games/s), {finished.mean():.3f} finished")
+    print('seat win rates:', np.bincount(results['winner'][finished], minlength=SEATS) / finished.sum())
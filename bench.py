@@ -0,0 +1,129 @@
+# 各版本引擎的性能基准: 所有前端共用 engine.Game, 按各自 create_app 时给的规则表 (见 rules.py, webapp.py) 开局
+# 用固定种子发牌, 分别计时牌型判断, is_consecutive, 各个 find_* 查找, choose_cards, get_game_state 序列化,
+# 以及不停顿的整局游戏, 打印每秒次数和每局耗时的分位数
+# 运行: python bench.py [--variants gdpt3 shishan] [--games 50]
+import argparse
+import importlib
+import inspect
+import json
+import time
+from engine import Game
+
+VARIANTS = ['gdpt', 'gdpt2', 'gdpt3', 'gdpt4', 'shishan', 'shishan2']
+MAX_TURNS = 2000
+MIN_BENCH_TIME = 0.2    # 每项微基准至少跑这么久
+
+# find_* 等方法按参数名取参数
+ARGS = {
+    'card_type': lambda hand: 'pair',
+    'last_played_cards': lambda hand: hand[:1],
+}
+
+
+def make_game(module, seed):
+    # 各前端只是 create_app 时给的规则表不同
+    return Game(seed=seed, rules=module.app.config['RULES'])
+
+
+def time_ops(fn, inputs):
+    # 反复对所有输入调用 fn, 至少跑 MIN_BENCH_TIME 秒, 返回每秒次数
+    ops = 0
+    start = time.perf_counter()
+    while True:
+        for args in inputs:
+            fn(*args)
+        ops += len(inputs)
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_BENCH_TIME:
+            return ops / elapsed
+
+
+def micro_benchmarks(module, seeds):
+    games = [make_game(module, seed) for seed in seeds]
+    hands = [player.hand for game in games for player in game.players if player.hand]
+    results = {}
+    game = games[0]
+
+    subsets = [(list(hand)[:k],) for hand in hands for k in range(1, 7)]
+    results['get_card_type'] = time_ops(game.get_card_type, subsets)
+    results['is_consecutive'] = time_ops(game.is_consecutive, [([3, 4, 5, 6, 7],), ([3, 5, 6, 7, 8],), ([9, 10, 11],)])
+
+    for name, method in sorted(inspect.getmembers(game, inspect.ismethod)):
+        if not name.startswith('find_'):
+            continue
+        params = list(inspect.signature(method).parameters)
+        if params[0] != 'cards' or any(p not in ARGS for p in params[1:]):
+            continue
+        inputs = [(hand,) + tuple(ARGS[p](hand) for p in params[1:]) for hand in hands]
+        results[name] = time_ops(method, inputs)
+
+    # choose_cards 会读桌面上的牌, 首家和跟牌各测一次
+    leads = [(g, p) for g in games for p in g.players]
+    results['choose_cards (lead)'] = time_ops(lambda g, p: g.choose_cards(p), leads)
+    for g in games:
+        g.last_played_cards = list(g.players[0].hand)[:1]
+    results['choose_cards (follow)'] = time_ops(lambda g, p: g.choose_cards(p), leads[1::4])
+
+    fresh = [(make_game(module, seed),) for seed in seeds]
+    results['get_game_state + json.dumps'] = time_ops(lambda g: json.dumps(g.get_game_state()), fresh)
+    return results
+
+
+def full_games(module, seeds, max_turns=MAX_TURNS):
+    latencies = []
+    turns = 0
+    for seed in seeds:
+        game = make_game(module, seed)
+        start = time.perf_counter()
+        for turn in range(max_turns):
+            if game.game_over:
+                break
+            game.play_turn()
+            turns += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, turns
+
+
+def percentile(values, p):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def run(variants, n_games, seed=0, max_turns=MAX_TURNS):
+    seeds = [seed + i for i in range(n_games)]
+    report = {}
+    # 前端的停顿只在 /play 的生成器里, 这里直接调用 play_turn 不会停
+    for name in variants:
+        module = importlib.import_module(name)
+        micro = micro_benchmarks(module, seeds[:8])
+        latencies, turns = full_games(module, seeds, max_turns)
+        report[name] = {'micro': micro, 'latencies': latencies, 'turns': turns}
+    return report
+
+
+def print_report(report):
+    for name, result in report.items():
+        print(f"== {name}")
+        for bench, ops in result['micro'].items():
+            print(f"  {bench:<32} {ops:>12,.0f} ops/s")
+        latencies = result['latencies']
+        total = sum(latencies)
+        print(f"  full games: {len(latencies)} played, "
+              f"{len(latencies) / total if total else 0:.1f} games/s, {result['turns'] / total if total else 0:,.0f} turns/s")
+        print("  per-game latency ms: " + ', '.join(f"p{p} {percentile(latencies, p) * 1000:.2f}" for p in (50, 90, 99)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='引擎性能基准')
+    parser.add_argument('--variants', nargs='+', default=VARIANTS, choices=VARIANTS)
+    parser.add_argument('--games', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-turns', type=int, default=MAX_TURNS)
+    args = parser.parse_args()
+    print_report(run(args.variants, args.games, args.seed, args.max_turns))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# 牌表: 两副牌里每一种牌只有一个共享的 Card 实例 (享元), 带有小整数 id 和预先算好的哈希/排序键
+CARD_TYPES = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A', 'S', 'X']
+CARD_VALUES = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14, 'S': 15, 'X': 16}
+SUITS = ['♠', '♥', '♣', '♦']
+SUIT_VALUES = {'♠': 1, '♥': 2, '♣': 3, '♦': 4}
+RANK_INDEX = {rank: i for i, rank in enumerate(CARD_TYPES)}
+SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+
+NUM_RANKS = 13      # 2 ~ A, 可以组成顺子/钢板/同花顺的点数
+SMALL_JOKER = 13
+BIG_JOKER = 14
+WILD_RANK = 'R'     # 红桃级牌, 任意牌
+WILD_SUIT = '♥'
+
+
+class Card:
+    __slots__ = ('rank', 'suit', 'id', 'rank_index', 'suit_index', 'order', 'name')
+
+    def __new__(cls, rank, suit):
+        # 只返回牌表里的实例, 相同的牌永远是同一个对象, 相等比较就是 is 比较
+        return _INTERNED[rank, suit]
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return self.name
+
+    def __hash__(self):
+        return self.id
+
+    def __lt__(self, other):
+        if isinstance(other, Card):
+            return self.order < other.order
+        return False
+
+    def __reduce__(self):
+        return card_by_id, (self.id,)
+
+
+def _make_card(rank, suit, card_id):
+    card = object.__new__(Card)
+    card.rank = rank
+    card.suit = suit
+    card.id = card_id
+    card.rank_index = RANK_INDEX.get(rank)       # 任意牌为 None
+    card.suit_index = SUIT_INDEX.get(suit)       # 大小王为 None
+    card.order = (CARD_VALUES.get(rank, 0), SUIT_VALUES.get(suit, 0))
+    card.name = f"{rank}{suit}"
+    return card
+
+
+# id: 点数下标 * 4 + 花色下标 (0~51), 小王 52, 大王 53, 任意牌 54
+CARDS = [_make_card(rank, suit, i * len(SUITS) + j) for i, rank in enumerate(CARD_TYPES[:NUM_RANKS]) for j, suit in enumerate(SUITS)]
+CARDS.append(_make_card('S', '', len(CARDS)))
+CARDS.append(_make_card('X', '', len(CARDS)))
+CARDS.append(_make_card(WILD_RANK, WILD_SUIT, len(CARDS)))
+_INTERNED = {(card.rank, card.suit): card for card in CARDS}
+
+# 一副牌 54 张, 顺序和原来的 create_deck 一致; 任意牌由红桃级牌在发牌时替换
+DECK = [_INTERNED[rank, suit] for suit in SUITS for rank in CARD_TYPES[:NUM_RANKS]] + [CARDS[SMALL_JOKER * len(SUITS)], CARDS[SMALL_JOKER * len(SUITS) + 1]]
+WILD_CARD = CARDS[-1]
+
+
+def card_by_id(card_id):
+    return CARDS[card_id]
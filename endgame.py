@@ -0,0 +1,154 @@
+# 残局精确求解: 牌很少时四家手牌全部可见, 对两队的胜负做 alpha-beta 搜索 (0/2 队赢为 +1, 1/3 队赢为 -1)
+# 局面按 Zobrist 哈希放进有上限的置换表; 搜索中直接在手牌上出牌/收回, 不复制牌局
+# 用法: game.bots[seat] = endgame_bot, 牌多的时候仍然用 choose_cards
+from engine import Game
+from hand import Hand
+from moves import legal_moves, classify, take
+from rules import SHISHAN
+from zobrist import HAND_KEYS, TURN_KEYS
+
+ENDGAME_CARDS = 40          # 四家剩余的牌加起来不超过这么多张时尝试精确求解
+MAX_NODES = 20000           # 每步的节点预算, 搜不完就退回默认出牌
+MAX_ENTRIES = 1 << 18
+SEATS = 4
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchAborted(Exception):
+    pass
+
+
+class EndgameSolver:
+    def __init__(self, max_nodes=MAX_NODES, max_entries=MAX_ENTRIES):
+        self.max_nodes = max_nodes
+        self.max_entries = max_entries
+        self.table = {}
+        self.nodes = 0
+        self.rules = SHISHAN
+
+    def load(self, game):
+        # 只在根节点复制一次手牌, 之后都在这份手牌上出牌/收回; 换了规则或级牌时置换表里的结果不再适用
+        if game.ranking is not self.rules:
+            self.rules = game.ranking
+            self.table.clear()
+        self.hands = [Hand(player.hand, HAND_KEYS[player.position]) for player in game.players]
+        self.current = game.current_player
+        self.last = (game.last_move or classify(game.last_played_cards, self.rules)) if game.last_played_cards else None
+        self.last_player = game.last_player
+        self.passes = game.passes
+
+    def solve(self, game):
+        # 返回 (胜负, 最好的出法), 出法为 None 表示pass; 超出节点预算时返回 None
+        self.load(game)
+        self.nodes = 0
+        try:
+            best_value, best_move = None, None
+            maximizing = self.current % 2 == 0
+            for move in self.moves():
+                value = self.play(move, -1, 1)
+                if best_value is None or (value > best_value if maximizing else value < best_value):
+                    best_value, best_move = value, move
+                    if best_value == (1 if maximizing else -1):
+                        break
+            return best_value, best_move
+        except SearchAborted:
+            return None
+
+    def key(self):
+        # 手牌和出牌顺序用增量维护的 Zobrist 哈希, 桌面牌型和pass数直接放进键里
+        h = TURN_KEYS[self.current]
+        for hand in self.hands:
+            h ^= hand.hash
+        return h, self.last, self.last_player, self.passes
+
+    def moves(self):
+        # 能一手出完的先试, 其次张数多的; 跟牌时最后试pass
+        hand = self.hands[self.current]
+        moves = sorted(legal_moves(hand, self.last, wild=True, rules=self.rules), key=lambda m: (m.length != len(hand), -m.length, m.key))
+        if self.last is not None:
+            moves.append(None)
+        return moves
+
+    def play(self, move, alpha, beta):
+        seat = self.current
+        saved = (self.last, self.last_player, self.passes)
+        if move is None:
+            played = []
+            self.passes += 1
+        else:
+            hand = self.hands[seat]
+            played = take(hand, move)
+            for card in played:
+                hand.remove(card)
+            if not hand:
+                hand.extend(played)
+                return 1 if seat % 2 == 0 else -1
+            self.last, self.last_player, self.passes = move, seat, 0
+        self.current = (seat + 1) % SEATS
+        if self.passes == SEATS - 1:
+            self.last, self.passes, self.current = None, 0, self.last_player
+        try:
+            return self.search(alpha, beta)
+        finally:
+            self.hands[seat].extend(played)
+            self.current = seat
+            self.last, self.last_player, self.passes = saved
+
+    def search(self, alpha, beta):
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise SearchAborted()
+        key = self.key()
+        entry = self.table.get(key)
+        if entry is not None:
+            value, flag = entry
+            if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+                return value
+
+        alpha0, beta0 = alpha, beta
+        maximizing = self.current % 2 == 0
+        best = -1 if maximizing else 1
+        for move in self.moves():
+            value = self.play(move, alpha, beta)
+            if maximizing:
+                best = max(best, value)
+                alpha = max(alpha, value)
+            else:
+                best = min(best, value)
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if len(self.table) >= self.max_entries:
+            self.table.clear()
+        flag = UPPER if best <= alpha0 else LOWER if best >= beta0 else EXACT
+        self.table[key] = (best, flag)
+        return best
+
+
+def cards_left(game):
+    return sum(len(player.hand) for player in game.players)
+
+
+solver = EndgameSolver()
+
+
+def endgame_bot(game, player):
+    # 置换表在多次调用之间保留, 前几步搜不完的局面后面常常能直接命中
+    if cards_left(game) <= ENDGAME_CARDS:
+        result = solver.solve(game)
+        if result is not None:
+            value, move = result
+            return take(player.hand, move) if move is not None else []
+    return game.choose_cards(player)
+
+
+def analyze(deal, moves_played, rules=SHISHAN):
+    # 离线分析: 按发牌编码重建牌局, 重放前 moves_played 回合 (默认出牌), 返回这时的精确胜负
+    game = Game.from_deal(deal, rules)
+    for i in range(moves_played):
+        if game.game_over:
+            break
+        game.play_turn()
+    return solver.solve(game)
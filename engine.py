@@ -0,0 +1,412 @@
+# 掼蛋游戏引擎: 不依赖 Flask, 也不在出牌之间停顿, 可以直接导入做离线模拟
+import random
+from cards import CARD_TYPES, NUM_RANKS, SMALL_JOKER, BIG_JOKER, DECK, WILD_CARD, card_by_id
+from hand import Hand, as_hand
+from moves import MOVE_TYPES, BOMB_TYPES, legal_moves, moves_of_type, classify, take, bomb_power
+from movelog import MoveLog, LEVEL, PASS, WIN, REPORT, TRIBUTE, TRIBUTE_BACK
+from zobrist import HAND_KEYS, TURN_KEYS, LEVEL_KEYS, cards_hash
+from phasetimer import clock
+from rules import SHISHAN
+
+MAX_TURNS = 2000  # 防止自定义的出牌函数一直pass导致死循环
+HAND_SIZE = SHISHAN.hand_size
+DECK_SIZE = SHISHAN.deck_size
+DEAL_BYTES = DECK_SIZE + 1  # 一局的发牌编码: 洗好的 108 张牌 id (一副牌的规则是 54 张), 加上级牌的点数下标
+
+
+def encode_deal(deck, rank_card):
+    return bytes(card.id for card in deck) + bytes([CARD_TYPES.index(rank_card)])
+
+
+def full_deck(rules, rank_card):
+    # 按规则用一副或两副牌, 牌都是牌表里共享的实例, 不再每局新建
+    # 有任意牌的规则把红桃级牌换成任意牌
+    wild = rules.wild
+    return [WILD_CARD if wild and card.suit == '♥' and card.rank == rank_card else card for card in DECK] * rules.decks
+
+
+def decode_deal(data, rules=SHISHAN):
+    if len(data) != rules.deck_size + 1:
+        raise ValueError(f"{rules.name} deal encoding must be {rules.deck_size + 1} bytes, got {len(data)}")
+    if data[-1] >= NUM_RANKS:
+        raise ValueError(f"deal level byte must be below {NUM_RANKS}, got {data[-1]}")
+    rank_card = CARD_TYPES[data[-1]]
+    # 牌必须正好是这套规则在这个级牌下的整副牌, 不能多也不能少
+    if sorted(data[:-1]) != sorted(card.id for card in full_deck(rules, rank_card)):
+        raise ValueError(f"deal cards are not a {rules.name} deck at level {rank_card}")
+    return [card_by_id(card_id) for card_id in data[:-1]], rank_card
+
+class Player:
+    def __init__(self, name, position):
+        self.name = name
+        self.position = position
+        self.hand = Hand(keys=HAND_KEYS[position])  # 手牌增减时顺带更新 Zobrist 哈希
+        self.reported = False
+
+    def play_card(self, card):
+        self.hand.remove(card)
+
+    def add_card(self, card):
+        self.hand.append(card)
+
+    def report_cards(self):
+        if len(self.hand) <= 10 and not self.reported:
+            self.reported = True
+            return len(self.hand)
+        return None
+
+class Game:
+    def __init__(self, seed=None, deal=None, rules=SHISHAN):
+        # 每局牌有自己的随机数发生器, 同一个 seed 总是发出同样的牌; deal 是 encode_deal 的编码, 直接按它发牌
+        # rules 是 rules.py 里的规则表: 几副牌, 每人几张, 点数顺序, 任意牌和允许的牌型
+        self.rules = rules
+        self.ranking = None  # 当局级牌的点数顺序表 (rules.at_level), 牌型识别和比较都用它, 发牌时确定
+        self.rng = random.Random(seed)
+        self.players = [Player(f"Player{i+1}", i) for i in range(4)]
+        self.current_player = 0
+        self.last_played_cards = []
+        self.last_move = None  # 桌面牌的牌型记录, 出牌时算一次, 跟牌时不用再识别
+        self.table_hash = 0    # 桌面牌和级牌的 Zobrist 哈希, 手牌部分由各家的 Hand 维护
+        self.last_player = None
+        self.last_turn = (None, [])  # 上一回合: (座位, 打出的牌), 用于生成增量状态
+        self.passes = 0
+        self.game_over = False
+        self.game_log = MoveLog([player.name for player in self.players])  # 二进制记录, 按需渲染成文本
+        self.rank_card = None
+        self.trump_suit = '♥'
+        self.level = 2
+        self.bots = [None] * len(self.players)  # 每个座位可以指定出牌函数 bot(game, player), 默认用 choose_cards
+        self.timer = None  # 设为 phasetimer.PhaseTimer 时记录 play_turn 各阶段和 get_game_state 的耗时
+        self.deal = None
+        self.reset_game(deal)
+
+    @classmethod
+    def from_deal(cls, deal, rules=SHISHAN):
+        return cls(deal=deal, rules=rules)
+
+    def create_deck(self):
+        deck = full_deck(self.rules, self.rank_card)
+        self.rng.shuffle(deck)
+        return deck
+
+    def deal_cards(self, deck=None):
+        self.deck = deck if deck is not None else self.create_deck()
+        self.deal = encode_deal(self.deck, self.rank_card)
+        for player in self.players:
+            player.hand.clear()
+        for i in range(self.rules.hand_size):
+            for player in self.players:
+                player.hand.append(self.deck.pop())
+
+    def play_turn(self):
+        timer = self.timer
+        if timer:
+            start = clock()
+        player = self.players[self.current_player]
+        bot = self.bots[self.current_player]
+        played_cards = bot(self, player) if bot else self.choose_cards(player)
+        if timer:
+            now = clock()
+            timer.record('decision', now - start)
+            start = now
+        self.last_turn = (self.current_player, played_cards)
+        if not played_cards:
+            self.game_log.record(PASS, player.position)
+            if self.last_played_cards:
+                self.passes += 1  # 桌面上没有牌时pass只是让给下家, 不算一轮里的pass
+        else:
+            for card in played_cards:
+                player.play_card(card)
+            if timer:
+                now = clock()
+                timer.record('removal', now - start)
+            move = classify(played_cards, self.ranking)
+            self.game_log.play(player.position, played_cards, move.type if move else None)
+            if not player.hand:
+                self.game_over = True
+                self.game_log.record(WIN, player.position)
+            self.table_hash ^= cards_hash(self.last_played_cards) ^ cards_hash(played_cards)
+            self.last_played_cards = played_cards
+            self.last_move = move
+            self.last_player = self.current_player
+            self.passes = 0
+
+        # 轮到下一个玩家
+        self.current_player = (self.current_player + 1) % 4
+
+        # 其他三个玩家都pass之后一轮结束,由最后出牌的玩家重新出牌
+        if timer:
+            start = clock()
+        if self.passes == len(self.players) - 1:
+            self.table_hash ^= cards_hash(self.last_played_cards)
+            self.last_played_cards = []
+            self.last_move = None
+            self.passes = 0
+            self.current_player = self.last_player
+        if timer:
+            now = clock()
+            timer.record('reset', now - start)
+            start = now
+
+        # 报牌
+        for player in self.players:
+            card_count = player.report_cards()
+            if card_count is not None:
+                self.game_log.record(REPORT, player.position, value=card_count)
+        if timer:
+            timer.record('report', clock() - start)
+
+
+
+    def choose_cards(self, player):
+        rules = self.ranking
+        if not self.last_played_cards:
+            # 当前玩家是第一个出牌,按牌型顺序出点数最小的牌
+            moves = legal_moves(player.hand, wild=True, rules=rules)
+            if moves:
+                return take(player.hand, min(moves, key=lambda m: (m.wild, MOVE_TYPES.index(m.type), m.key, m.length)))
+            return []  # 如果找不到合适的牌,则选择pass
+        else:
+            last = self.last_move or classify(self.last_played_cards, rules)
+            if last is None:
+                return []
+            moves = legal_moves(player.hand, last, wild=True, rules=rules)
+            if last.type not in BOMB_TYPES:
+                # 当前玩家不是第一个出牌,尽可能出点数大的同种牌型来压制对手
+                same_type = [m for m in moves if m.type == last.type]
+                if same_type:
+                    return take(player.hand, max(same_type, key=lambda m: (-m.wild, m.key)))
+            if moves:
+                # 没有同种牌型,出最小的能压住的炸弹
+                return take(player.hand, min(moves, key=lambda m: (m.wild, bomb_power(m), m.key)))
+            return []  # 找不到更大的牌,只能选择pass
+
+    def compare_cards(self, cards1, cards2):
+        move1 = classify(cards1, self.ranking)
+        move2 = classify(cards2, self.ranking)
+        if move1 and move2 and move1.type == move2.type:
+            return move1.key - move2.key
+        else:
+            return 0
+
+    def find_bigger_cards(self, cards, last_played_cards):
+        hand = as_hand(cards)
+        last = classify(last_played_cards, self.ranking)
+        bombs = [m for m in legal_moves(hand, last, wild=True, rules=self.ranking) if m.type in BOMB_TYPES]
+        if bombs:
+            return take(hand, min(bombs, key=lambda m: (m.wild, bomb_power(m), m.key)))
+        return []
+
+    def find_cards_by_type(self, cards, card_type):
+        hand = as_hand(cards)
+        moves = moves_of_type(hand, card_type, True, self.ranking)
+        if moves:
+            return take(hand, min(moves, key=lambda m: (m.wild, m.key, m.length)))
+        return []
+
+    def find_same_type_cards(self, cards, card_type):
+        hand = as_hand(cards)
+        moves = moves_of_type(hand, card_type, True, self.ranking)
+        if moves:
+            return take(hand, max(moves, key=lambda m: (-m.wild, m.key, m.length)))
+        return []
+
+    def find_runs(self, cards, card_type):
+        # 先是不用任意牌的, 再是用任意牌补空位的
+        hand = as_hand(cards)
+        return [take(hand, m) for m in moves_of_type(hand, card_type, True, self.ranking)]
+
+    def find_sequences(self, cards):
+        return self.find_runs(cards, 'sequence')
+
+    def find_sequence_pairs(self, cards):
+        return self.find_runs(cards, 'sequence_pair')
+
+    def find_bombs(self, cards):
+        hand = as_hand(cards)
+        return [hand.cards_of(r, hand.rank_counts[r]) for r in hand.ranks_with(4, range(NUM_RANKS))]
+
+    def find_straight_flushes(self, cards):
+        return self.find_runs(cards, 'straight_flush')
+
+    def find_four_kings(self, cards):
+        # 四大天王: 两张小王和两张大王
+        hand = as_hand(cards)
+        if hand.rank_counts[SMALL_JOKER] == 2 and hand.rank_counts[BIG_JOKER] == 2:
+            return hand.cards_of(SMALL_JOKER, 2) + hand.cards_of(BIG_JOKER, 2)
+        return []
+
+    def find_rockets(self, cards):
+        hand = as_hand(cards)
+        if hand.rank_counts[SMALL_JOKER] and hand.rank_counts[BIG_JOKER]:
+            return [hand.cards_of(SMALL_JOKER, 1) + hand.cards_of(BIG_JOKER, 1)]
+        return []
+
+    def find_trio_single(self, cards):
+        hand = as_hand(cards)
+        trios = hand.ranks_with(3)
+        if trios:
+            singles = [r for r in hand.ranks_with(1) if r != trios[0]]
+            if singles:
+                return hand.cards_of(trios[0], 3) + hand.cards_of(singles[0], 1)
+        return []
+
+    def find_trio_pair(self, cards):
+        hand = as_hand(cards)
+        trios = hand.ranks_with(3)
+        if trios:
+            pairs = [r for r in hand.ranks_with(2) if r != trios[0]]
+            if pairs:
+                return hand.cards_of(trios[0], 3) + hand.cards_of(pairs[0], 2)
+        return []
+
+    def is_consecutive(self, values):
+        return sorted(values) == list(range(min(values), max(values) + 1))
+
+    def get_card_type(self, cards):
+        move = classify(cards, self.ranking)
+        return move.type if move else None
+
+    def get_game_state(self):
+        if self.timer:
+            start = clock()
+        game_state = {
+            'players': [{'name': player.name, 'hand': [str(card) for card in player.hand]} for player in self.players],
+            'current_player': self.current_player,
+            'last_played_cards': [str(card) for card in self.last_played_cards],
+            'game_over': self.game_over,
+            'game_log': list(self.game_log),
+            'rank_card': self.rank_card,
+            'trump_suit': self.trump_suit,
+            'level': self.level
+        }
+        if self.timer:
+            self.timer.record('state', clock() - start)
+        return game_state
+
+    def get_state_delta(self, log_start):
+        # 上一回合相对之前状态的增量: 出牌玩家手里少了哪些牌, 新的桌面牌, 新增的记录和当前玩家
+        seat, played_cards = self.last_turn
+        return {
+            'type': 'delta',
+            'seat': seat,
+            'removed': [str(card) for card in played_cards],
+            'last_played_cards': [str(card) for card in self.last_played_cards],
+            'game_log': self.game_log[log_start:],
+            'current_player': self.current_player,
+            'game_over': self.game_over
+        }
+
+    def reset_game(self, deal=None):
+        if deal is None:
+            self.set_rank_card()
+            self.deal_cards()
+        else:
+            deck, self.rank_card = decode_deal(deal, self.rules)
+            self.deal_cards(deck)
+        self.ranking = self.rules.at_level(self.rank_card)
+        self.current_player = 0
+        self.last_played_cards = []
+        self.last_move = None
+        self.table_hash = LEVEL_KEYS[CARD_TYPES.index(self.rank_card)]
+        self.last_player = None
+        self.last_turn = (None, [])
+        self.passes = 0
+        self.game_over = False
+        self.game_log.clear()
+        self.level = 2
+
+    @property
+    def zobrist(self):
+        # 64 位局面哈希: 四手牌, 轮到谁, 桌面上的牌, 级牌; 各部分都是增量维护的, 这里只做几次异或
+        h = self.table_hash ^ TURN_KEYS[self.current_player]
+        for player in self.players:
+            h ^= player.hand.hash
+        return h
+
+    def set_rank_card(self):
+        rank = self.rng.choice(CARD_TYPES[:-2])  # 随机选择一个级牌,不包括大小王
+        self.rank_card = rank
+        self.game_log.record(LEVEL, value=CARD_TYPES.index(rank))
+
+    def upgrade_level(self, pair1, pair2):
+        # 实现升级逻辑
+        if pair1.rank == pair2.rank:
+            if pair1.rank == self.rank_card:
+                self.level = 3
+            else:
+                self.level = 2
+        else:
+            self.level = 1
+
+    def pay_tribute(self, player):
+        # 实现进贡逻辑
+        if self.level == 3:
+            for card in player.hand:
+                if card.rank == 'R':
+                    player.play_card(card)
+                    self.game_log.record(TRIBUTE, player.position, [card])
+                    break
+
+    def return_tribute(self, player):
+        # 实现还贡逻辑
+        if self.level == 3:
+            for card in self.deck:
+                if card.rank == 'R':
+                    player.add_card(card)
+                    self.deck.remove(card)
+                    self.game_log.record(TRIBUTE_BACK, player.position)
+                    break
+
+    def report_cards(self):
+        # 实现报牌逻辑
+        for player in self.players:
+            card_count = player.report_cards()
+            if card_count is not None:
+                self.game_log.record(REPORT, player.position, value=card_count)
+
+
+def play_game(game, max_turns=MAX_TURNS):
+    turns = 0
+    while not game.game_over and turns < max_turns:
+        game.play_turn()
+        turns += 1
+    return turns
+
+
+def run_game(game, bots=None, max_turns=MAX_TURNS, game_seed=None, timer=None):
+    if bots:
+        game.bots = list(bots)
+    game.timer = timer
+    turns = play_game(game, max_turns)
+    winner = game.last_player if game.game_over else None
+    return {
+        'seed': game_seed,
+        'winner': winner,
+        'team': winner % 2 if winner is not None else None,
+        'turns': turns,
+        'rank_card': game.rank_card,
+        'cards_left': [len(player.hand) for player in game.players]
+    }
+
+
+def run_seeded(game_seed, bots=None, max_turns=MAX_TURNS, timer=None, rules=SHISHAN):
+    return run_game(Game(seed=game_seed, rules=rules), bots, max_turns, game_seed, timer)
+
+
+def run_deal(deal, bots=None, max_turns=MAX_TURNS, timer=None, rules=SHISHAN):
+    # 按发牌编码重放一局, 不需要重新洗牌
+    return run_game(Game.from_deal(deal, rules), bots, max_turns, timer=timer)
+
+
+def game_seeds(n_games, seed=None):
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for i in range(n_games)]
+
+
+def simulate(n_games, seed=None, bots=None, max_turns=MAX_TURNS, deals=None, timer=None, rules=SHISHAN):
+    # 全速跑完 n_games 局, 返回每局的结果; bots 是四个座位的出牌函数, None 表示用默认的 choose_cards
+    # 给出 deals (发牌编码列表) 时按这些牌局重放, 忽略 n_games 和 seed; 给出 timer 时所有牌局的分阶段耗时都累加到它上面
+    if deals is not None:
+        return [run_deal(deal, bots, max_turns, timer, rules) for deal in deals]
+    return [run_seeded(game_seed, bots, max_turns, timer, rules) for game_seed in game_seeds(n_games, seed)]
@@ -0,0 +1,131 @@
+# 计数向量手牌: 在牌列表之外维护 点数×花色 计数矩阵 (两副牌, 取值 0~2) 和任意牌计数,
+# 各种牌型查找只需读取计数, 不再对手牌反复调用 cards.count(c)
+# 给出 keys (zobrist.HAND_KEYS[座位]) 时, 同时维护这手牌的 Zobrist 哈希, 每加减一张牌异或一次
+
+from cards import CARD_TYPES, SUITS, NUM_RANKS
+
+RUN_ORDER = range(NUM_RANKS)
+
+
+class Hand(list):
+    def __init__(self, cards=(), keys=None):
+        super().__init__()
+        self.counts = [[0] * len(SUITS) for _ in CARD_TYPES]
+        self.rank_counts = [0] * len(CARD_TYPES)
+        self.wild = 0
+        self.keys = keys
+        self.hash = 0
+        self.extend(cards)
+
+    def held(self, card):
+        # 手里有几张和 card 相同的牌
+        if card.rank_index is None:
+            return self.wild
+        return self.counts[card.rank_index][card.suit_index or 0]
+
+    def _count(self, card, n):
+        if self.keys is not None:
+            # 第 k 张相同的牌用第 k 个随机数: 加牌时是加之前的张数, 减牌时是减之后的张数
+            self.hash ^= self.keys[card.id][self.held(card) if n > 0 else self.held(card) - 1]
+        r = card.rank_index
+        if r is None:
+            self.wild += n
+            return
+        self.counts[r][card.suit_index or 0] += n  # 大小王没有花色, 记在第0列
+        self.rank_counts[r] += n
+
+    def append(self, card):
+        super().append(card)
+        self._count(card, 1)
+
+    def extend(self, cards):
+        for card in cards:
+            self.append(card)
+
+    def insert(self, index, card):
+        super().insert(index, card)
+        self._count(card, 1)
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    def __imul__(self, n):
+        cards = list(self)
+        self.clear()
+        self.extend(cards * n)
+        return self
+
+    def __setitem__(self, index, value):
+        # 切片赋值时 value 可能是迭代器, 先取成列表; 先减去旧牌再加上新牌, 计数和哈希都跟着变
+        old = self[index] if isinstance(index, slice) else [self[index]]
+        new = list(value) if isinstance(index, slice) else [value]
+        super().__setitem__(index, new if isinstance(index, slice) else value)
+        for card in old:
+            self._count(card, -1)
+        for card in new:
+            self._count(card, 1)
+
+    def __delitem__(self, index):
+        old = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for card in old:
+            self._count(card, -1)
+
+    def remove(self, card):
+        super().remove(card)
+        self._count(card, -1)
+
+    def pop(self, index=-1):
+        card = super().pop(index)
+        self._count(card, -1)
+        return card
+
+    def clear(self):
+        super().clear()
+        for row in self.counts:
+            row[:] = [0] * len(SUITS)
+        self.rank_counts[:] = [0] * len(CARD_TYPES)
+        self.wild = 0
+        self.hash = 0
+
+    def ranks_with(self, n, ranks=None):
+        # 张数不少于 n 的点数, 从小到大
+        rank_counts = self.rank_counts
+        return [r for r in (ranks if ranks is not None else range(len(CARD_TYPES))) if rank_counts[r] >= n]
+
+    def runs(self, width, n, suit=None, order=None):
+        # 连续 width 个点数每个至少 n 张的起始位置, 用滑动窗口在 O(点数) 内完成
+        # order 是能连的点数下标 (rules.Ruleset.run_order), 默认 2~A; 返回的是在 order 里的位置
+        if order is None:
+            order = RUN_ORDER
+        if suit is None:
+            rank_counts = self.rank_counts
+            ok = [rank_counts[r] >= n for r in order]
+        else:
+            counts = self.counts
+            ok = [counts[r][suit] >= n for r in order]
+        starts = []
+        streak = 0
+        for i, good in enumerate(ok):
+            streak = streak + 1 if good else 0
+            if streak >= width:
+                starts.append(i - width + 1)
+        return starts
+
+    def cards_of(self, rank, n, suit=None):
+        # 从牌列表中取出 n 张指定点数(和花色)的牌, 只在确定要出的牌之后调用一次
+        picked = []
+        for card in self:
+            if card.rank_index == rank and (suit is None or card.suit_index == suit):
+                picked.append(card)
+                if len(picked) == n:
+                    break
+        return picked
+
+    def wilds(self, n):
+        return [card for card in self if card.rank_index is None][:n]
+
+
+def as_hand(cards):
+    return cards if isinstance(cards, Hand) else Hand(cards)
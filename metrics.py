@@ -0,0 +1,116 @@
+# 服务端指标: 计数器和直方图按线程分片, 每个线程只写自己的分片, 热路径上没有锁;
+# /metrics 抓取时才把各分片加起来, 输出 Prometheus 文本格式; 已经退出的线程的分片并进 retired
+import threading
+
+from phasetimer import BUCKETS, PhaseTimer, clock
+
+PREFIX = 'guandan'
+# 每个直方图每次都输出同一组 le 边界 (桶号 b 的上界是 2^b), 空桶也输出, rate() 和 histogram_quantile 才能跨抓取对齐;
+# 比第一个边界小的计入第一个桶, 比最后一个边界大的只计入 +Inf
+BYTE_BUCKETS = range(6, 25)     # 64 字节 ~ 16 MB
+NS_BUCKETS = range(10, 35)      # 约 1 微秒 ~ 17 秒
+
+
+class Shard:
+    def __init__(self):
+        self.counters = {}
+        self.timings = PhaseTimer()     # 纳秒
+        self.sizes = PhaseTimer()       # 字节
+
+    def merge(self, other):
+        # other 可能是别的线程正在写的分片, 先复制一份再遍历, 避免遍历时字典变大
+        for name, value in list(other.counters.items()):
+            self.counters[name] = self.counters.get(name, 0) + value
+        self.timings.merge(other.timings)
+        self.sizes.merge(other.sizes)
+        return self
+
+
+class Metrics:
+    def __init__(self):
+        self.local = threading.local()
+        self.shards = []        # [(线程, 分片)]
+        self.retired = Shard()
+        self.lock = threading.Lock()
+
+    def shard(self):
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = self.local.shard = Shard()
+            with self.lock:
+                self.shards.append((threading.current_thread(), shard))
+        return shard
+
+    def inc(self, name, n=1):
+        counters = self.shard().counters
+        counters[name] = counters.get(name, 0) + n
+
+    def observe_ns(self, name, ns):
+        self.shard().timings.record(name, ns)
+
+    def observe_size(self, name, n):
+        self.shard().sizes.record(name, n)
+
+    def timer(self):
+        # 当前线程的计时器, 可以直接赋给 Game.timer
+        return self.shard().timings
+
+    def collect(self):
+        total = Shard()
+        with self.lock:
+            alive = []
+            for thread, shard in self.shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self.retired.merge(shard)
+            self.shards = alive
+            total.merge(self.retired)
+            for thread, shard in alive:
+                total.merge(shard)
+        return total
+
+    def render(self, gauges=()):
+        total = self.collect()
+        counters = total.counters
+        lines = []
+
+        def metric(name, kind, value, labels=''):
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            lines.append(f"{PREFIX}_{name}{labels} {value}")
+
+        for name, value in gauges:
+            metric(name, 'gauge', value)
+        metric('sse_streams', 'gauge', counters.get('streams_opened', 0) - counters.get('streams_closed', 0))
+        metric('turns_total', 'counter', counters.get('turns', 0))  # 每秒回合数用 rate(guandan_turns_total) 算
+        metric('stream_bytes_total', 'counter', counters.get('stream_bytes', 0))
+        self.histogram(lines, 'stream_bytes', total.sizes, 'stream_bytes', 1, BYTE_BUCKETS)
+        self.histogram(lines, 'json_dumps_seconds', total.timings, 'json_dumps', 1e-9, NS_BUCKETS)
+        lines.append(f"# TYPE {PREFIX}_turn_phase_seconds histogram")
+        for phase in ('decision', 'removal', 'reset', 'report', 'state'):
+            self.histogram(lines, 'turn_phase_seconds', total.timings, phase, 1e-9, NS_BUCKETS, f'phase="{phase}"', header=False)
+        return '\n'.join(lines) + '\n'
+
+    def histogram(self, lines, name, timer, key, scale, bounds, labels='', header=True):
+        if header:
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+        count, total, buckets = timer.phases.get(key, (0, 0, [0] * BUCKETS))
+        sep = ',' if labels else ''
+        cumulative = sum(buckets[:bounds[0]])
+        for b in bounds:
+            cumulative += buckets[b]
+            lines.append(f'{PREFIX}_{name}_bucket{{{labels}{sep}le="{(1 << b) * scale:g}"}} {cumulative}')
+        lines.append(f'{PREFIX}_{name}_bucket{{{labels}{sep}le="+Inf"}} {count}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f"{PREFIX}_{name}_sum{suffix} {total * scale:g}")
+        lines.append(f"{PREFIX}_{name}_count{suffix} {count}")
+
+
+metrics = Metrics()
+
+
+def timed_dumps(dumps, data):
+    start = clock()
+    text = dumps(data)
+    metrics.observe_ns('json_dumps', clock() - start)
+    return text
@@ -0,0 +1,183 @@
+# 确定化蒙特卡洛出牌: 按还没出现过的牌随机抽样三家对手的手牌, 每个候选出法都在 batch 引擎里
+# 成批模拟到终局, 在毫秒预算内反复抽样, 选本队平均胜率最高的出法
+# 搜索用的局面就是 batch 的计数张量和花色平面, 复制/抽样都是数组运算, 不复制 Game 对象
+# 用法: game.bots[seat] = MonteCarloBot(budget_ms=200), 或者 tournament --bots montecarlo:bot,...
+import time
+
+import numpy as np
+
+from batch import BatchGames, CARD_COLUMN, CARD_SUIT, NUM_COLUMNS, SEATS, LEAD, SINGLE, PAIR, TRIO, BOMB
+from cards import NUM_RANKS, SUITS
+from engine import DECK_SIZE
+from movelog import PLAY
+from moves import MOVE_TYPES, legal_moves, classify, take
+from rules import SHISHAN
+
+DEFAULT_BUDGET_MS = 200
+SAMPLES_PER_ROUND = 32
+FIRST_ROUND_SAMPLES = 1     # 第一轮每个候选只抽一份, 量出一轮要多久, 后面的轮次按剩下的时间定大小
+ROUND_MARGIN = 1.5          # 剩下的时间至少是预计耗时的这么多倍才开始下一轮; 每轮模拟的长短不一
+MAX_CANDIDATES = 24
+ROLLOUT_TURNS = 600
+
+GROUP_TYPES = {'single': SINGLE, 'pair': PAIR, 'trio': TRIO, 'bomb': BOMB}
+
+
+def table_state(move):
+    # 把桌面上的出牌换成 batch 引擎的 (牌型, 点数, 张数); batch 不认识的牌型只能用炸弹压
+    # batch 不分级牌, 点数按不分级牌的基础顺序 (也就是 batch 的列号)
+    if move is None:
+        return LEAD, -1, 0
+    if move.type in GROUP_TYPES:
+        key = SHISHAN.power[move.parts[0][0]] if move.parts else SHISHAN.wild_power
+        return GROUP_TYPES[move.type], key, move.length
+    if move.type == 'straight_flush':
+        return BOMB, NUM_RANKS, 5          # 比五张炸弹大, 比六张炸弹小
+    if move.type == 'four_kings':
+        return BOMB, NUM_COLUMNS, 99
+    return BOMB, NUM_RANKS, 3
+
+
+def card_counts(ids):
+    ids = np.asarray(ids, dtype=np.int64)
+    counts = np.bincount(CARD_COLUMN[ids], minlength=NUM_COLUMNS)
+    suits = CARD_SUIT[ids]
+    natural = suits >= 0
+    planes = np.bincount(suits[natural] * NUM_RANKS + CARD_COLUMN[ids][natural], minlength=len(SUITS) * NUM_RANKS)
+    return counts, planes.reshape(len(SUITS), NUM_RANKS)
+
+
+def unseen_cards(game, player):
+    # 整副牌减去自己的手牌和已经打出的牌 (包括没发出去的 8 张底牌)
+    remaining = np.bincount(np.frombuffer(game.deal[:DECK_SIZE], dtype=np.uint8), minlength=len(CARD_COLUMN))
+    seen = [card.id for card in player.hand]
+    for kind, seat, move_type, value, cards in game.game_log.records():
+        if kind == PLAY:
+            seen.extend(cards)
+    remaining -= np.bincount(seen, minlength=len(CARD_COLUMN))
+    return np.repeat(np.arange(len(remaining)), remaining)
+
+
+def sample_hands(pool, seats, sizes, n, rng):
+    # n 份对手手牌的抽样: 把没见过的牌洗乱后按各家张数分开, 多出来的是底牌 -> N×4×16 计数, N×4×4×13 花色平面
+    decks = rng.permuted(np.tile(pool, (n, 1)), axis=1)[:, :sum(sizes)]
+    owner = np.repeat(seats, sizes)
+    slots = np.arange(n)[:, None] * SEATS + owner[None, :]
+    columns = CARD_COLUMN[decks]
+    counts = np.bincount((slots * NUM_COLUMNS + columns).ravel(), minlength=n * SEATS * NUM_COLUMNS)
+    suits = CARD_SUIT[decks]
+    natural = suits >= 0
+    planes = np.bincount(((slots * len(SUITS) + suits) * NUM_RANKS + columns)[natural],
+                         minlength=n * SEATS * len(SUITS) * NUM_RANKS)
+    return counts.reshape(n, SEATS, NUM_COLUMNS), planes.reshape(n, SEATS, len(SUITS), NUM_RANKS)
+
+
+def candidates(hand, last, rules=SHISHAN):
+    # 同牌型同点数同张数的出法只留一个 (不用任意牌的优先), 再按牌型顺序截断
+    moves = {}
+    for m in sorted(legal_moves(hand, last, wild=True, rules=rules), key=lambda m: (m.wild, MOVE_TYPES.index(m.type), m.key, m.length)):
+        moves.setdefault((m.type, m.key, m.length), m)
+    return list(moves.values())[:MAX_CANDIDATES]
+
+
+class MonteCarloBot:
+    def __init__(self, budget_ms=DEFAULT_BUDGET_MS, samples=SAMPLES_PER_ROUND, seed=None):
+        self.budget_ms = budget_ms
+        self.samples = samples
+        self.rng = np.random.default_rng(seed)
+        self.playouts = 0
+        self.elapsed = 0.0
+
+    def __call__(self, game, player):
+        start = time.perf_counter()
+        try:
+            return self.choose(game, player, start + self.budget_ms / 1000)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def choose(self, game, player, deadline):
+        if game.rules is not SHISHAN:
+            return game.choose_cards(player)    # 批量引擎只实现了两副牌的规则
+        me = player.position
+        last = (game.last_move or classify(game.last_played_cards, game.ranking)) if game.last_played_cards else None
+        moves = candidates(player.hand, last, game.ranking)
+        if last is None and len(moves) == 1:
+            return take(player.hand, moves[0])
+        if not moves:
+            return []
+        plays = [take(player.hand, m) for m in moves]
+        for cards in plays:
+            if len(cards) == len(player.hand):
+                return cards                    # 一手出完直接赢
+        if last is not None:
+            plays.append([])                    # 跟牌时pass也是一个选择
+
+        seats = [seat for seat in range(SEATS) if seat != me]
+        sizes = [len(game.players[seat].hand) for seat in seats]
+        pool = unseen_cards(game, player)
+        if len(pool) < sum(sizes):
+            return game.choose_cards(player)    # 记录和手牌对不上 (比如自定义的进贡), 退回默认策略
+
+        own_counts, own_planes = card_counts([card.id for card in player.hand])
+        after = [card_counts([card.id for card in cards]) for cards in plays]
+        current, last_type, last_key, last_size, last_player, passes = self.next_states(game, me, moves, last)
+
+        k, s = len(plays), FIRST_ROUND_SAMPLES
+        wins = np.zeros(k)
+        rounds = 0
+        last_round = 0.0
+        while True:
+            now = time.perf_counter()
+            # 一轮的耗时主要是批量引擎逐回合推进的固定开销, 批量翻倍时耗时不到翻倍;
+            # 时间够两轮就把批量翻倍, 够一轮就按原大小再跑一轮, 否则停下
+            if now + ROUND_MARGIN * 2 * last_round <= deadline and rounds:
+                s = min(self.samples, s * 2)
+            elif now + ROUND_MARGIN * last_round > deadline:
+                break
+            counts, planes = sample_hands(pool, seats, sizes, s, self.rng)
+            counts = np.tile(counts, (k, 1, 1))
+            planes = np.tile(planes, (k, 1, 1, 1))
+            for i, (played, played_planes) in enumerate(after):
+                counts[i * s:(i + 1) * s, me] = own_counts - played
+                planes[i * s:(i + 1) * s, me] = own_planes - played_planes
+            rollout = BatchGames.from_position(counts, planes, np.repeat(current, s), np.repeat(last_type, s),
+                                               np.repeat(last_key, s), np.repeat(last_size, s),
+                                               np.repeat(last_player, s), np.repeat(passes, s))
+            winner = rollout.run(ROLLOUT_TURNS, deadline)['winner']   # 超时没打完的算平局
+            score = np.where(winner < 0, 0.5, winner % 2 == me % 2)
+            wins += score.reshape(k, s).sum(axis=1)
+            self.playouts += k * s
+            rounds += 1
+            last_round = time.perf_counter() - now
+        if not rounds:
+            return game.choose_cards(player)    # 预算在准备阶段就用完了
+        return plays[int(np.argmax(wins))]
+
+    def next_states(self, game, me, moves, last):
+        # 每个候选出法之后的局面: 出牌后轮到下家, pass 后按三家pass的规则处理
+        states = [((me + 1) % SEATS,) + table_state(m) + (me, 0) for m in moves]
+        if last is not None:
+            passes = game.passes + 1
+            if passes == SEATS - 1:
+                states.append((game.last_player,) + table_state(None) + (game.last_player, 0))
+            else:
+                states.append(((me + 1) % SEATS,) + table_state(last) + (game.last_player, passes))
+        return [np.array(column) for column in zip(*states)]
+
+
+bot = MonteCarloBot()
+
+
+if __name__ == '__main__':
+    import sys
+    from engine import Game, play_game
+
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    search = MonteCarloBot(budget_ms=50, seed=0)
+    team_wins = 0
+    for game_seed in range(n_games):
+        game = Game(seed=game_seed)
+        game.bots = [search, None, search, None]
+        play_game(game)
+        team_wins += game.game_over and game.last_player % 2 == 0
+    print(f"search team won {team_wins}/{n_games}, {search.playouts / search.elapsed:.0f} playouts/s")
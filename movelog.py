@@ -0,0 +1,96 @@
+# 二进制牌局记录: 每个事件是一条 16 字节的定长记录 (事件, 座位, 牌型, 数值, 最多12张牌的 id),
+# 只追加到 bytearray 里; 需要显示时才按下标渲染成原来的英文文本, 无界面的模拟不做任何字符串格式化
+import struct
+
+from cards import CARD_TYPES, card_by_id
+from moves import MOVE_TYPES
+
+RECORD = struct.Struct('<BBBB12s')
+RECORD_SIZE = RECORD.size
+MAX_CARDS = 12
+NO_CARD = 0xFF
+NO_SEAT = 0xFF
+NO_TYPE = 0xFF
+
+# 事件种类
+LEVEL, PLAY, PASS, WIN, REPORT, TRIBUTE, TRIBUTE_BACK = range(7)
+
+
+def pack_cards(cards):
+    if len(cards) > MAX_CARDS:
+        raise ValueError(f"a log record holds at most {MAX_CARDS} cards, got {len(cards)}")
+    return bytes(card.id for card in cards).ljust(MAX_CARDS, bytes([NO_CARD]))
+
+
+def unpack_cards(data):
+    return [card_by_id(card_id) for card_id in data if card_id != NO_CARD]
+
+
+class MoveLog:
+    def __init__(self, names, data=b''):
+        self.names = names
+        self.data = bytearray(data)
+        self.text = []  # 已经渲染过的文本, 界面反复读取完整记录时不用重新渲染
+
+    def __len__(self):
+        return len(self.data) // RECORD_SIZE
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.lines()[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('log index out of range')
+        return self.render(index)
+
+    def __iter__(self):
+        return iter(self.lines())
+
+    def clear(self):
+        self.data.clear()
+        self.text.clear()
+
+    def lines(self):
+        for i in range(len(self.text), len(self)):
+            self.text.append(self.render(i))
+        return self.text
+
+    @property
+    def nbytes(self):
+        return len(self.data)
+
+    def to_bytes(self):
+        return bytes(self.data)
+
+    def record(self, kind, seat=NO_SEAT, cards=(), move_type=NO_TYPE, value=0):
+        self.data += RECORD.pack(kind, seat, move_type, value, pack_cards(cards))
+
+    def play(self, seat, cards, move_type=None):
+        self.record(PLAY, seat, cards, MOVE_TYPES.index(move_type) if move_type else NO_TYPE)
+
+    def records(self):
+        # 供程序读取: (事件, 座位, 牌型, 数值, 牌 id 列表)
+        for kind, seat, move_type, value, cards in RECORD.iter_unpack(bytes(self.data)):
+            yield (kind, None if seat == NO_SEAT else seat,
+                   None if move_type == NO_TYPE else MOVE_TYPES[move_type],
+                   value, [card_id for card_id in cards if card_id != NO_CARD])
+
+    def render(self, index):
+        kind, seat, move_type, value, cards = RECORD.unpack_from(self.data, index * RECORD_SIZE)
+        name = self.names[seat] if seat != NO_SEAT else None
+        if kind == PLAY:
+            return f"{name} plays {' '.join(str(card) for card in unpack_cards(cards))}."
+        elif kind == PASS:
+            return f"{name} passes."
+        elif kind == WIN:
+            return f"{name} wins!"
+        elif kind == REPORT:
+            return f"{name} reports {value} cards."
+        elif kind == LEVEL:
+            return f"本局级牌为: {CARD_TYPES[value]}"
+        elif kind == TRIBUTE:
+            return f"{name} pays tribute with {unpack_cards(cards)[0]}."
+        elif kind == TRIBUTE_BACK:
+            return f"{name} gets the tribute card back."
+        raise ValueError(f"unknown log event {kind}")
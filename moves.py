@@ -0,0 +1,379 @@
+# 出牌枚举: 一次扫描计数向量, 列出一手牌所有合法的出法
+from collections import namedtuple
+from functools import lru_cache
+from itertools import accumulate, combinations
+
+from cards import SUITS, NUM_RANKS, SMALL_JOKER, BIG_JOKER
+from hand import as_hand
+from rules import SHISHAN
+
+# 出牌记录: 牌型, 比较用的点数, 张数, ((点数下标, 张数), ...), 同花顺的花色, 用到的任意牌张数
+Move = namedtuple('Move', ['type', 'key', 'length', 'parts', 'suit', 'wild'])
+
+# 默认规则 (两副牌) 的点数大小: 单出/对出任意牌时, 任意牌大于A, 小于大小王; 其他规则见 rules.py
+RANK_POWER = SHISHAN.power
+WILD_POWER = SHISHAN.wild_power
+
+CLASSIFY_CACHE_SIZE = 4096
+
+BOMB_TYPES = ('bomb', 'straight_flush', 'four_kings', 'rocket')
+# 新牌型只能加在末尾, 二进制出牌记录里存的是这里的下标
+MOVE_TYPES = ['single', 'pair', 'trio', 'trio_pair', 'sequence', 'sequence_pair', 'steel_plate',
+              'bomb', 'straight_flush', 'four_kings', 'rocket', 'trio_single', 'four_pair', 'airplane']
+ALL_TYPES = frozenset(MOVE_TYPES)
+# 连牌: (牌型, 几个点数, 每个点数几张), 按枚举的顺序; WILD_RUNS 是识别用任意牌补空位的连牌时的优先顺序,
+# 同样的牌两种都能组成时取排在前面的
+RUNS = (('sequence', 5, 1), ('sequence_pair', 3, 2), ('steel_plate', 2, 3), ('straight_flush', 5, 1))
+WILD_RUNS = (('straight_flush', 5, 1), ('sequence', 5, 1), ('steel_plate', 2, 3), ('sequence_pair', 3, 2))
+# 飞机: 张数 -> (几个相连的三张, 每个三张带几张); 带的牌各不同点数, 也不和三张同点数
+AIRPLANES = {8: (2, 1), 10: (2, 2), 12: (3, 1)}
+MAX_COPIES = 8      # 两副牌同一点数最多 8 张
+# DEFICIT[n][c]: 手里有 c 张时离 n 张还差几张
+DEFICIT = [[max(0, n - c) for c in range(MAX_COPIES + 1)] for n in range(4)]
+
+
+def bomb_power(move):
+    # 炸弹大小: 4张 < 5张 < 同花顺 < 6张 < 7张 < 8张及以上 < 四大天王, 普通牌型为0
+    if move.type == 'bomb':
+        return move.length * 2
+    elif move.type == 'straight_flush':
+        return 11
+    elif move.type in ('four_kings', 'rocket'):
+        return 100
+    return 0
+
+
+def beats(move, last):
+    if last is None:
+        return True
+    if move.type in BOMB_TYPES or last.type in BOMB_TYPES:
+        return (bomb_power(move), move.key) > (bomb_power(last), last.key)
+    return move.type == last.type and move.length == last.length and move.key > last.key
+
+
+def _group(card_type, rank, n, wild=0, rules=SHISHAN):
+    return Move(card_type, rules.power[rank], n + wild, ((rank, n),), None, wild)
+
+
+def _run(card_type, start, width, n, suit=None, rules=SHISHAN):
+    # start 是在 rules.run_order 里的位置, 也就是比较用的大小
+    return Move(card_type, start, width * n, tuple((r, n) for r in rules.run_order[start:start + width]), suit, 0)
+
+
+def _airplane(start, width, wings, rules):
+    # wings 是带的牌 ((点数下标, 张数), ...), 按点数下标从小到大
+    trios = tuple((r, 3) for r in rules.run_order[start:start + width])
+    return Move('airplane', start, sum(n for r, n in wings) + width * 3, trios + wings, None, 0)
+
+
+def _filled_run(card_type, start, width, n, have, suit, wild, rules):
+    # have[点数下标] 是手里能用的张数 (同花顺只数这个花色), 缺的 wild 张用任意牌补
+    parts = tuple([(r, n if have[r] >= n else have[r]) for r in rules.run_order[start:start + width] if have[r]])
+    return Move(card_type, start, width * n, parts, suit, wild)
+
+
+def _windows(have, order, width, n, wild):
+    # 和 Hand.runs 一样找连牌, 同时数出每个窗口缺几张: [(起始位置, 缺几张)], 只返回缺口不超过 wild 的;
+    # 窗口的缺口是前缀和相减, 一次扫描同时得到不用补的连牌和要用任意牌补的连牌
+    deficit = DEFICIT[n]
+    gaps = [0, *accumulate([deficit[have[r]] for r in order])]
+    return [(start, b - a) for start, (a, b) in enumerate(zip(gaps, gaps[width:])) if b - a <= wild]
+
+
+@lru_cache(maxsize=None)
+def follow_types(last_type, rules):
+    # 跟牌时只需要枚举同种牌型和炸弹, 再去掉这套规则不允许的牌型
+    types = BOMB_TYPES if last_type in BOMB_TYPES else BOMB_TYPES + (last_type,)
+    return rules.combos.intersection(types)
+
+
+def legal_moves(cards, last=None, wild=False, rules=SHISHAN):
+    # wild=True 时允许任意牌和同点数的牌组成对子, 三张和炸弹, 或者补进顺子, 连对, 钢板和同花顺的空位
+    hand = as_hand(cards)
+    if last is None:
+        return _enumerate(hand, wild, rules.combos, rules)
+    return [m for m in _enumerate(hand, wild, follow_types(last.type, rules), rules) if beats(m, last)]
+
+
+def moves_of_type(cards, card_type, wild=False, rules=SHISHAN):
+    # 只枚举一种牌型, 不用先列出所有出法再过滤
+    if card_type not in rules.combos:
+        return []
+    return _enumerate(as_hand(cards), wild, (card_type,), rules)
+
+
+def _enumerate(hand, wild, types, rules=SHISHAN):
+    rank_counts = hand.rank_counts
+    wilds = hand.wild if wild else 0
+    power = rules.power
+    run_order = rules.run_order
+    moves = []
+
+    singles = 'single' in types
+    pairs = 'pair' in types
+    trios = 'trio' in types
+    bombs = 'bomb' in types
+    for r, n in enumerate(rank_counts):
+        if not n:
+            continue
+        if singles:
+            moves.append(_group('single', r, 1, 0, rules))
+        if pairs and n >= 2:
+            moves.append(_group('pair', r, 2, 0, rules))
+        if r >= NUM_RANKS:
+            continue
+        if trios and n >= 3:
+            moves.append(_group('trio', r, 3, 0, rules))
+        if bombs:
+            for size in range(4, n + 1):
+                moves.append(_group('bomb', r, size, 0, rules))
+        if wilds:
+            if pairs and n < 2 <= n + wilds:
+                moves.append(_group('pair', r, n, 2 - n, rules))
+            if trios and n < 3 <= n + wilds:
+                moves.append(_group('trio', r, n, 3 - n, rules))
+            if bombs:
+                for size in range(max(4, n + 1), n + wilds + 1):
+                    moves.append(_group('bomb', r, n, size - n, rules))
+
+    # 任意牌本身也可以单出或对出
+    if singles and hand.wild:
+        moves.append(Move('single', rules.wild_power, 1, (), None, 1))
+    if pairs and hand.wild >= 2:
+        moves.append(Move('pair', rules.wild_power, 2, (), None, 2))
+
+    if 'trio_pair' in types:
+        for t in hand.ranks_with(3, range(NUM_RANKS)):
+            for p in hand.ranks_with(2, range(NUM_RANKS)):
+                if p != t:
+                    moves.append(Move('trio_pair', power[t], 5, ((t, 3), (p, 2)), None, 0))
+    if 'trio_single' in types:
+        for t in hand.ranks_with(3, range(NUM_RANKS)):
+            for p in hand.ranks_with(1, range(NUM_RANKS)):
+                if p != t:
+                    moves.append(Move('trio_single', power[t], 4, ((t, 3), (p, 1)), None, 0))
+    if 'four_pair' in types:
+        for q in hand.ranks_with(4, range(NUM_RANKS)):
+            for p in hand.ranks_with(2, range(NUM_RANKS)):
+                if p != q:
+                    moves.append(Move('four_pair', power[q], 6, ((q, 4), (p, 2)), None, 0))
+    if 'airplane' in types:
+        for width, n in AIRPLANES.values():
+            for start in hand.runs(width, 3, None, run_order):
+                trios = run_order[start:start + width]
+                kickers = [r for r in hand.ranks_with(n, range(NUM_RANKS)) if r not in trios]
+                for wings in combinations(kickers, width):
+                    moves.append(_airplane(start, width, tuple((r, n) for r in wings), rules))
+
+    if 'four_kings' in types and rank_counts[SMALL_JOKER] == 2 and rank_counts[BIG_JOKER] == 2:
+        moves.append(Move('four_kings', 0, 4, ((SMALL_JOKER, 2), (BIG_JOKER, 2)), None, 0))
+    if 'rocket' in types and rank_counts[SMALL_JOKER] and rank_counts[BIG_JOKER]:
+        moves.append(Move('rocket', 0, 2, ((SMALL_JOKER, 1), (BIG_JOKER, 1)), None, 0))
+
+    if wilds:
+        moves.extend(_filled_runs(hand, wilds, types, rules))
+        types = ()      # 连牌已经连同要补任意牌的一起列出来了
+    sequences = hand.runs(5, 1, None, run_order) if 'sequence' in types or 'straight_flush' in types else ()
+    if 'sequence' in types:
+        for start in sequences:
+            move = _run('sequence', start, 5, 1, None, rules)
+            if not _one_suit(hand, move):
+                moves.append(move)
+    if 'sequence_pair' in types:
+        for start in hand.runs(3, 2, None, run_order):
+            moves.append(_run('sequence_pair', start, 3, 2, None, rules))
+    if 'steel_plate' in types:
+        for start in hand.runs(2, 3, None, run_order):
+            moves.append(_run('steel_plate', start, 2, 3, None, rules))
+    if 'straight_flush' in types and sequences:
+        # 没有顺子就不可能有同花顺
+        for suit in range(len(SUITS)):
+            for start in hand.runs(5, 1, suit, run_order):
+                moves.append(_run('straight_flush', start, 5, 1, suit, rules))
+    return moves
+
+
+def _filled_runs(hand, wilds, types, rules):
+    # 有任意牌时的连牌: 每种连牌一次扫描, 缺口为 0 的是普通连牌, 缺口不超过任意牌张数的用任意牌补;
+    # 同样的牌能放进几个窗口时 classify 取最大的那个, 所以第一个点数是空位的窗口 (最上面的窗口除外) 直接跳过;
+    # 同样的牌能看成几种连牌时 (比如两对相邻的对子加两张任意牌) 只保留 classify 认定的那一种, 这样打出去的牌和选中的出法一致
+    run_order = rules.run_order
+    moves = []
+    filled = []
+    sequences = None
+    for card_type, width, n in RUNS:
+        if card_type not in types:
+            continue
+        if card_type == 'straight_flush':
+            if sequences is None:
+                sequences = _windows(hand.rank_counts, run_order, 5, 1, wilds)
+            if not sequences:
+                continue    # 补上任意牌也凑不出顺子, 就不可能有同花顺
+            rows = enumerate(zip(*hand.counts))     # 每个花色一行, 按点数下标
+        else:
+            rows = ((None, hand.rank_counts),)
+        top = len(run_order) - width
+        for suit, have in rows:
+            windows = _windows(have, run_order, width, n, wilds)
+            if card_type == 'sequence':
+                sequences = windows
+            for start, missing in windows:
+                if not missing:
+                    move = _run(card_type, start, width, n, suit, rules)
+                    if card_type != 'sequence' or not _one_suit(hand, move):
+                        moves.append(move)
+                elif have[run_order[start]] or start == top:
+                    move = _filled_run(card_type, start, width, n, have, suit, missing, rules)
+                    if card_type != 'sequence' or not _one_suit(hand, move):
+                        filled.append(move)
+    return moves + [m for m in filled if classify_signature((m.parts, m.wild, m.suit), rules) == m]
+
+
+def _one_suit(hand, move):
+    # 顺子里每个点数手里都只有同一个花色的牌时, 怎么取都是同花, 打出去就是同花顺, 不能当顺子列出
+    suits = set()
+    for r, n in move.parts:
+        suits.update(s for s, count in enumerate(hand.counts[r]) if count)
+    return len(suits) == 1
+
+
+def take(cards, move):
+    # 把出牌记录还原成手牌中的具体牌
+    hand = as_hand(cards)
+    picked = []
+    for r, n in move.parts:
+        picked.extend(hand.cards_of(r, n, move.suit))
+    if move.type == 'sequence' and len({card.suit_index for card in picked}) == 1:
+        # 取出来的牌正好同花会被认成同花顺; 手里有同点数别的花色就换一张
+        suit = picked[0].suit_index
+        for i, card in enumerate(picked):
+            others = [s for s in range(len(SUITS)) if s != suit and hand.counts[card.rank_index][s]]
+            if others:
+                picked[i] = hand.cards_of(card.rank_index, 1, others[0])[0]
+                break
+    return picked + hand.wilds(move.wild)
+
+
+def signature(cards):
+    # 出牌的规范签名: ((点数下标, 张数), ...), 任意牌张数, 同花花色 (只有全是单张且同花时才记录)
+    counts = {}
+    suits = set()
+    wild = 0
+    for card in cards:
+        r = card.rank_index
+        if r is None:
+            wild += 1
+            continue
+        counts[r] = counts.get(r, 0) + 1
+        suits.add(card.suit_index)
+    flush = None
+    if len(suits) == 1 and len(counts) == len(cards) - wild:
+        flush = suits.pop()
+    return tuple(sorted(counts.items())), wild, flush
+
+
+def classify(cards, rules=SHISHAN):
+    return classify_signature(signature(cards), rules)
+
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def classify_signature(sig, rules=SHISHAN):
+    # 缓存按 (签名, 规则) 区分; 规则表不允许的牌型返回 None
+    move = _classify(sig, rules)
+    if move is not None and move.type in rules.combos:
+        return move
+    return None
+
+
+def _classify(sig, rules):
+    groups, wild, flush = sig
+    size = sum(n for r, n in groups) + wild
+    if wild:
+        # 任意牌可以单出/对出, 和同一点数组成对子, 三张和炸弹, 或者补进连牌的空位
+        if not groups:
+            return Move(['single', 'pair'][size - 1], rules.wild_power, size, (), None, size) if size <= 2 else None
+        if len(groups) == 1 and groups[0][0] < NUM_RANKS:
+            r, n = groups[0]
+            if size <= 3:
+                return _group(['pair', 'trio'][size - 2], r, n, wild, rules)
+            return _group('bomb', r, n, wild, rules)
+        return _classify_filled(groups, wild, flush, size, rules)
+    if not groups:
+        return None
+    ranks = [r for r, n in groups]
+    counts = sorted(n for r, n in groups)
+    if len(groups) == 1:
+        r, n = groups[0]
+        if n <= 3:
+            return _group(['single', 'pair', 'trio'][n - 1], r, n, 0, rules)
+        if r < NUM_RANKS:
+            return _group('bomb', r, n, 0, rules)
+    elif ranks == [SMALL_JOKER, BIG_JOKER]:
+        if counts == [2, 2]:
+            return Move('four_kings', 0, 4, groups, None, 0)
+        if counts == [1, 1]:
+            return Move('rocket', 0, 2, groups, None, 0)
+    elif counts == [2, 3] and ranks[-1] < NUM_RANKS:
+        (trio, _), (pair, _) = sorted(groups, key=lambda g: -g[1])
+        return Move('trio_pair', rules.power[trio], 5, ((trio, 3), (pair, 2)), None, 0)
+    elif counts == [1, 3] and ranks[-1] < NUM_RANKS:
+        (trio, _), (single, _) = sorted(groups, key=lambda g: -g[1])
+        return Move('trio_single', rules.power[trio], 4, ((trio, 3), (single, 1)), None, 0)
+    elif counts == [2, 4] and ranks[-1] < NUM_RANKS:
+        (quad, _), (pair, _) = sorted(groups, key=lambda g: -g[1])
+        return Move('four_pair', rules.power[quad], 6, ((quad, 4), (pair, 2)), None, 0)
+    elif size in AIRPLANES and ranks[-1] < NUM_RANKS:
+        return _classify_airplane(groups, size, rules)
+    else:
+        # 连牌按规则里能连的顺序判断, 例如一副牌的规则里 2 不能连
+        positions = sorted(rules.run_position[r] for r in ranks if rules.run_position[r] is not None)
+        width = len(ranks)
+        if len(positions) != width or positions[-1] - positions[0] != width - 1:
+            return None
+        start = positions[0]
+        if width == 5 and counts == [1] * 5:
+            if flush is not None:
+                return _run('straight_flush', start, 5, 1, flush, rules)
+            return _run('sequence', start, 5, 1, None, rules)
+        elif width == 3 and counts == [2, 2, 2]:
+            return _run('sequence_pair', start, 3, 2, None, rules)
+        elif width == 2 and counts == [3, 3]:
+            return _run('steel_plate', start, 2, 3, None, rules)
+    return None
+
+
+def _classify_airplane(groups, size, rules):
+    # 三张的点数要相连, 其余每个点数正好是带的张数
+    width, n = AIRPLANES[size]
+    trios = [r for r, k in groups if k == 3]
+    wings = tuple((r, k) for r, k in groups if k != 3)
+    if len(trios) != width or len(wings) != width or any(k != n for r, k in wings):
+        return None
+    positions = [rules.run_position[r] for r in trios]
+    if None in positions or max(positions) - min(positions) != width - 1:
+        return None
+    return _airplane(min(positions), width, wings, rules)
+
+
+def _classify_filled(groups, wild, flush, size, rules):
+    # 任意牌补空位的连牌: 所有点数都能连, 每个点数不超过 n 张, 并且落在同一个 width 宽的窗口里;
+    # 张数对上时缺的正好是任意牌的张数; 窗口有几个位置可选时取最大的
+    positions = [rules.run_position[r] for r, n in groups]
+    if None in positions:
+        return None
+    low, high = min(positions), max(positions)
+    for card_type, width, n in WILD_RUNS:
+        if card_type not in rules.combos or width * n != size or high - low >= width:
+            continue
+        if card_type == 'straight_flush' and flush is None:
+            continue
+        if any(k > n for r, k in groups):
+            continue
+        start = min(low, len(rules.run_order) - width)
+        return Move(card_type, start, size, groups, flush if card_type == 'straight_flush' else None, wild)
+    return None
+
+
+def classify_cache_info():
+    # 命中/未命中次数, 用于确认长时间自我对局中缓存是否有效
+    return classify_signature.cache_info()
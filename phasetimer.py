@@ -0,0 +1,60 @@
+# 分阶段计时: 每个阶段记录次数, 总耗时和按 2 的幂分桶的耗时直方图 (纳秒), 直方图可以直接相加,
+# 多局或多进程的结果用 merge 汇总; Game.timer 默认为 None, 不计时时 play_turn 只多几次 None 判断
+import time
+
+BUCKETS = 64    # 第 b 个桶: 耗时在 [2^(b-1), 2^b) 纳秒之间
+
+clock = time.perf_counter_ns
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.phases = {}    # 阶段名 -> [次数, 总纳秒, 直方图]
+
+    def record(self, phase, ns):
+        entry = self.phases.get(phase)
+        if entry is None:
+            entry = self.phases[phase] = [0, 0, [0] * BUCKETS]
+        entry[0] += 1
+        entry[1] += ns
+        entry[2][min(ns.bit_length(), BUCKETS - 1)] += 1
+
+    def merge(self, other):
+        for phase, (count, total, histogram) in list(other.phases.items()):  # other 可能还在被别的线程写
+            entry = self.phases.get(phase)
+            if entry is None:
+                entry = self.phases[phase] = [0, 0, [0] * BUCKETS]
+            entry[0] += count
+            entry[1] += total
+            entry[2] = [a + b for a, b in zip(entry[2], histogram)]
+        return self
+
+    def reset(self):
+        self.phases.clear()
+
+    def percentile(self, phase, p):
+        # 按直方图估计, 返回所在桶的上界 (纳秒)
+        count, total, histogram = self.phases[phase]
+        rank = p / 100 * count
+        seen = 0
+        for b, n in enumerate(histogram):
+            seen += n
+            if n and seen >= rank:
+                return 1 << b
+        return 0
+
+    def summary(self):
+        return {phase: {
+            'count': count,
+            'total_ms': total / 1e6,
+            'mean_us': total / count / 1e3 if count else 0.0,
+            'p50_us': self.percentile(phase, 50) / 1e3,
+            'p99_us': self.percentile(phase, 99) / 1e3
+        } for phase, (count, total, histogram) in self.phases.items()}
+
+    def report(self):
+        lines = []
+        for phase, s in self.summary().items():
+            lines.append(f"{phase:<10} {s['count']:>9} calls {s['total_ms']:>10.1f} ms  "
+                         f"mean {s['mean_us']:>8.2f} us  p50 <{s['p50_us']:.2f} us  p99 <{s['p99_us']:.2f} us")
+        return '\n'.join(lines)
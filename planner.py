@@ -0,0 +1,144 @@
+# 手牌拆分规划: 对点数计数向量做动态规划, 求把一手牌出完最少要几手 (同样手数时保留更多炸弹),
+# 任意牌可以补进对子, 三张和炸弹; 拆法和级牌无关, 按 (计数, 任意牌张数) 用 lru_cache 记住, 牌越出越少时子问题直接命中;
+# 比较用的大小在取出拆法之后再按当局级牌的顺序表填上
+# 只看点数不看花色, 不考虑同花顺
+from functools import lru_cache
+
+from cards import NUM_RANKS, SMALL_JOKER, BIG_JOKER
+from moves import Move, BOMB_TYPES, legal_moves, classify, take
+from rules import SHISHAN
+
+PLAN_CACHE_SIZE = 1 << 16
+GROUP_NAMES = {1: 'single', 2: 'pair', 3: 'trio'}
+RUNS = (('sequence', 5, 1), ('sequence_pair', 3, 2), ('steel_plate', 2, 3))
+RUN_TYPES = frozenset(name for name, width, k in RUNS)
+DANGER_CARDS = 5    # 对手剩这么多张以内时, 不惜拆牌和用炸弹也要压
+
+
+def _group(rank, n, wild=0, rules=SHISHAN):
+    size = n + wild
+    return Move(GROUP_NAMES.get(size, 'bomb'), rules.power[rank], size, ((rank, n),), None, wild)
+
+
+def _ranked(move, rules):
+    # 缓存里的拆法不带大小 (key 为 None), 按规则表补上: 连牌是起点在连牌顺序里的位置, 其余看第一个点数
+    if move.type in RUN_TYPES:
+        key = rules.run_position[move.parts[0][0]]
+    elif move.parts:
+        key = rules.power[move.parts[0][0]]
+    else:
+        key = rules.wild_power
+    return move._replace(key=key)
+
+
+def _cost(moves):
+    # 先比手数, 再比炸弹个数 (多的好)
+    return len(moves), -sum(m.type in BOMB_TYPES for m in moves)
+
+
+def plan_counts(counts, wild, rules=SHISHAN):
+    # rules 是当局级牌的顺序表, 只影响出牌记录里比较用的大小, 不影响怎么拆
+    return tuple(_ranked(move, rules) for move in split_counts(counts, wild))
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def split_counts(counts, wild):
+    # counts: 2~A 十三个点数的张数; 返回最优拆法 (出牌记录的元组, key 为 None), 每次只决定最小点数的牌怎么出
+    r = next((i for i, n in enumerate(counts) if n), None)
+    if r is None:
+        if not wild:
+            return ()
+        return (Move(GROUP_NAMES[wild], None, wild, (), None, wild),)
+
+    best = None
+
+    def consider(moves, rest, rest_wild):
+        nonlocal best
+        plan = moves + split_counts(rest, rest_wild)
+        if best is None or _cost(plan) < _cost(best):
+            best = plan
+
+    n = counts[r]
+    # 这个点数的 k 张, 加上 w 张任意牌, 成为单张/对子/三张/炸弹
+    for k in range(n, 0, -1):
+        rest = counts[:r] + (n - k,) + counts[r + 1:]
+        for w in range(wild + 1):
+            if k + w > 1 or not w:
+                consider((Move(GROUP_NAMES.get(k + w, 'bomb'), None, k + w, ((r, k),), None, w),), rest, wild - w)
+
+    # 三带二: 这个点数做三张或者做对子, 另一部分取其他点数的牌
+    for p, m in enumerate(counts):
+        if p == r:
+            continue
+        for trio, pair in ((r, p), (p, r)):
+            if counts[trio] >= 3 and counts[pair] >= 2:
+                rest = list(counts)
+                rest[trio] -= 3
+                rest[pair] -= 2
+                consider((Move('trio_pair', None, 5, ((trio, 3), (pair, 2)), None, 0),), tuple(rest), wild)
+
+    # 从这个点数开始的顺子, 连对, 钢板
+    for name, width, k in RUNS:
+        if r + width <= NUM_RANKS and all(counts[i] >= k for i in range(r, r + width)):
+            rest = tuple(c - k if r <= i < r + width else c for i, c in enumerate(counts))
+            consider((Move(name, None, width * k, tuple((i, k) for i in range(r, r + width)), None, 0),), rest, wild)
+    return best
+
+
+def plan_vector(rank_counts, wild, rules=SHISHAN):
+    # rank_counts 含大小王 (15 个点数); 大小王只能单出, 对出或者组成四大天王, 单独处理
+    moves = plan_counts(tuple(rank_counts[:NUM_RANKS]), wild, rules)
+    small, big = rank_counts[SMALL_JOKER], rank_counts[BIG_JOKER]
+    if small == 2 and big == 2:
+        return moves + (Move('four_kings', 0, 4, ((SMALL_JOKER, 2), (BIG_JOKER, 2)), None, 0),)
+    return moves + tuple(_group(r, rank_counts[r], 0, rules) for r in (SMALL_JOKER, BIG_JOKER) if rank_counts[r])
+
+
+def plan(hand, rules=SHISHAN):
+    return plan_vector(hand.rank_counts, hand.wild, rules)
+
+
+def plan_after(hand, move, rules=SHISHAN):
+    # 打出 move 之后剩下的牌的拆法, 不用真的从手牌里拿走
+    rank_counts = list(hand.rank_counts)
+    for r, n in move.parts:
+        rank_counts[r] -= n
+    return plan_vector(rank_counts, hand.wild - move.wild, rules)
+
+
+def plan_cache_info():
+    return split_counts.cache_info()
+
+
+def planner_bot(game, player):
+    if game.rules is not SHISHAN:
+        return game.choose_cards(player)    # 拆分规划按两副牌的点数顺序 (2~A 连牌) 计算
+    hand = player.hand
+    rules = game.ranking
+    current = plan(hand, rules)
+    if not game.last_played_cards:
+        # 首家: 出拆法里最小的非炸弹牌, 同样大小时先出张数多的
+        lead = min(current, key=lambda m: (m.type in BOMB_TYPES, m.key, -m.length))
+        return take(hand, lead)
+
+    last = game.last_move or classify(game.last_played_cards, rules)
+    if last is None:
+        return []
+    danger = any(len(p.hand) <= DANGER_CARDS for p in game.players if p.position % 2 != player.position % 2)
+    if game.last_player % 2 == player.position % 2 and not danger:
+        return []   # 不压队友
+    best = None
+    for move in legal_moves(hand, last, wild=True, rules=rules):
+        after = plan_after(hand, move, rules)
+        if not after:
+            return take(hand, move)
+        score = (_cost(after), move.type in BOMB_TYPES, move.key)
+        if best is None or score < best[0]:
+            best = (score, move)
+    if best is None:
+        return []
+    (cost, bomb, key), move = best
+    # 不拆牌 (手数减少) 才跟, 炸弹只在对手快出完时用
+    if (cost[0] < len(current) and not bomb) or danger:
+        return take(hand, move)
+    return []
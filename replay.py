@@ -0,0 +1,202 @@
+# 牌局回放: 一个回放文件保存发牌编码, 二进制出牌记录, 以及每 K 回合一份的紧凑状态快照,
+# 跳到任意回合只需从最近的快照往后重放不超过 K 回合; 每一帧和 Game.get_game_state 的格式相同, index.html 可以直接显示
+import hashlib
+import os
+import struct
+from collections import OrderedDict
+
+from cards import card_by_id
+from engine import decode_deal
+from rules import SHISHAN, RULESETS
+from movelog import MoveLog, RECORD, PLAY, PASS
+
+MAGIC = b'GDRP'
+VERSION = 2
+DEFAULT_INTERVAL = 16
+SEATS = 4
+NO_SEAT = 0xFF
+
+HEADER = struct.Struct('<4sBBHII')       # 标识, 版本, 规则编号, 快照间隔, 记录字节数, 快照个数
+SNAPSHOT = struct.Struct('<IBBBB')       # 出牌记录的条数, 当前玩家, 最后出牌的玩家, 连续pass数, 是否结束
+LENGTH = struct.Struct('<H')
+
+
+def initial_state(deck, hand_size=SHISHAN.hand_size):
+    # 和 Game.deal_cards 一样从牌堆末尾轮流发牌
+    deck = list(deck)
+    hands = [[] for _ in range(SEATS)]
+    for i in range(hand_size):
+        for hand in hands:
+            hand.append(deck.pop().id)
+    return {'hands': hands, 'last_played': [], 'current': 0, 'last_player': None, 'passes': 0, 'game_over': False, 'log_len': 0}
+
+
+def apply_turn(state, seat, card_ids, log_len):
+    # 和 Game.play_turn 相同的规则推进一回合, 只处理牌 id
+    if not card_ids:
+        if state['last_played']:
+            state['passes'] += 1
+    else:
+        hand = state['hands'][seat]
+        for card_id in card_ids:
+            hand.remove(card_id)
+        if not hand:
+            state['game_over'] = True
+        state['last_played'] = list(card_ids)
+        state['last_player'] = seat
+        state['passes'] = 0
+    state['current'] = (seat + 1) % SEATS
+    if state['passes'] == SEATS - 1:
+        state['last_played'] = []
+        state['passes'] = 0
+        state['current'] = state['last_player']
+    state['log_len'] = log_len
+
+
+def pack_state(state):
+    last_player = NO_SEAT if state['last_player'] is None else state['last_player']
+    data = bytearray(SNAPSHOT.pack(state['log_len'], state['current'], last_player, state['passes'], state['game_over']))
+    for cards in state['hands'] + [state['last_played']]:
+        data.append(len(cards))
+        data += bytes(cards)
+    return bytes(data)
+
+
+def unpack_state(data):
+    log_len, current, last_player, passes, game_over = SNAPSHOT.unpack_from(data)
+    lists = []
+    offset = SNAPSHOT.size
+    for i in range(SEATS + 1):
+        n = data[offset]
+        lists.append(list(data[offset + 1:offset + 1 + n]))
+        offset += 1 + n
+    return {'hands': lists[:SEATS], 'last_played': lists[SEATS], 'current': current,
+            'last_player': None if last_player == NO_SEAT else last_player,
+            'passes': passes, 'game_over': bool(game_over), 'log_len': log_len}
+
+
+class Replay:
+    def __init__(self, deal, log_data, interval=DEFAULT_INTERVAL, snapshots=None, names=None, rules=SHISHAN):
+        self.rules = rules
+        self.deal = bytes(deal)
+        self.deck, self.rank_card = decode_deal(self.deal, rules)
+        self.log = MoveLog(names or [f"Player{i+1}" for i in range(SEATS)], log_data)
+        self.interval = interval
+        # 每回合: (座位, 打出的牌 id, 这回合结束时的记录条数)
+        self.turns = []
+        for index, (kind, seat, move_type, value, cards) in enumerate(self.log.records()):
+            if kind in (PLAY, PASS):
+                self.turns.append([seat, cards, index + 1])
+            elif self.turns:
+                self.turns[-1][2] = index + 1   # 报牌和获胜记录属于刚出完牌的这一回合
+        self.snapshots = snapshots if snapshots is not None else self.build_snapshots()
+
+    @classmethod
+    def from_game(cls, game, interval=DEFAULT_INTERVAL):
+        return cls(game.deal, game.game_log.to_bytes(), interval, names=[player.name for player in game.players], rules=game.rules)
+
+    def __len__(self):
+        # 帧数: 发牌后的初始状态加上每一回合
+        return len(self.turns) + 1
+
+    def build_snapshots(self):
+        state = initial_state(self.deck, self.rules.hand_size)
+        snapshots = [pack_state(state)]
+        for turn, (seat, cards, log_len) in enumerate(self.turns, 1):
+            apply_turn(state, seat, cards, log_len)
+            if turn % self.interval == 0:
+                snapshots.append(pack_state(state))
+        return snapshots
+
+    def state(self, turn):
+        if not 0 <= turn < len(self):
+            raise IndexError(f"turn {turn} out of range 0..{len(self) - 1}")
+        base = turn // self.interval
+        state = unpack_state(self.snapshots[base])
+        for seat, cards, log_len in self.turns[base * self.interval:turn]:
+            apply_turn(state, seat, cards, log_len)
+        return state
+
+    def frame(self, turn):
+        state = self.state(turn)
+        return {
+            'players': [{'name': name, 'hand': [str(card_by_id(card_id)) for card_id in hand]}
+                        for name, hand in zip(self.log.names, state['hands'])],
+            'current_player': state['current'],
+            'last_played_cards': [str(card_by_id(card_id)) for card_id in state['last_played']],
+            'game_over': state['game_over'],
+            'game_log': self.log[:state['log_len']],
+            'rank_card': self.rank_card,
+            'trump_suit': '♥',
+            'level': 2
+        }
+
+    def to_bytes(self):
+        data = bytearray(HEADER.pack(MAGIC, VERSION, self.rules.id, self.interval, self.log.nbytes, len(self.snapshots)))
+        data += self.deal
+        data += self.log.data
+        for snapshot in self.snapshots:
+            data += LENGTH.pack(len(snapshot))
+            data += snapshot
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, rules_id, interval, log_bytes, n_snapshots = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or rules_id >= len(RULESETS):
+            raise ValueError('not a replay file')
+        rules = RULESETS[rules_id]
+        offset = HEADER.size
+        deal = data[offset:offset + rules.deck_size + 1]
+        offset += rules.deck_size + 1
+        if log_bytes % RECORD.size:
+            raise ValueError('truncated move log in replay')
+        log_data = data[offset:offset + log_bytes]
+        offset += log_bytes
+        snapshots = []
+        for i in range(n_snapshots):
+            n, = LENGTH.unpack_from(data, offset)
+            snapshots.append(bytes(data[offset + LENGTH.size:offset + LENGTH.size + n]))
+            offset += LENGTH.size + n
+        return cls(deal, log_data, interval, snapshots, rules=rules)
+
+    def replay_id(self):
+        return hashlib.sha1(bytes([self.rules.id]) + self.deal + self.log.to_bytes()).hexdigest()[:16]
+
+
+class ReplayStore:
+    # 回放按内容哈希存取; 给出目录时写成 <id>.replay 文件, 最近用过的留在内存里
+    def __init__(self, directory=None, max_cached=64):
+        self.directory = directory
+        self.max_cached = max_cached
+        self.cache = OrderedDict()
+
+    def path(self, replay_id):
+        return os.path.join(self.directory, f"{replay_id}.replay")
+
+    def put(self, replay):
+        replay_id = replay.replay_id()
+        if self.directory and not os.path.exists(self.path(replay_id)):
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path(replay_id), 'wb') as f:
+                f.write(replay.to_bytes())
+        self._remember(replay_id, replay)
+        return replay_id
+
+    def get(self, replay_id):
+        replay = self.cache.get(replay_id)
+        if replay is not None:
+            self.cache.move_to_end(replay_id)
+            return replay
+        if not self.directory or not replay_id.isalnum() or not os.path.exists(self.path(replay_id)):
+            return None
+        with open(self.path(replay_id), 'rb') as f:
+            replay = Replay.from_bytes(f.read())
+        self._remember(replay_id, replay)
+        return replay
+
+    def _remember(self, replay_id, replay):
+        self.cache[replay_id] = replay
+        self.cache.move_to_end(replay_id)
+        while len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
@@ -0,0 +1,77 @@
+# 规则表: 每个版本的掼蛋只是一张数据表 (几副牌, 每人几张, 点数从小到大的顺序, 红桃级牌是否当任意牌, 允许哪些牌型),
+# 牌型识别, 出牌枚举和比较共用 moves.py 里的同一套代码, 只读这里启动时按规则算好的查找表
+from cards import CARD_TYPES, DECK, NUM_RANKS, RANK_INDEX, WILD_RANK
+
+GROUP_COMBOS = ('single', 'pair', 'trio', 'trio_pair', 'bomb')
+RUN_COMBOS = ('sequence', 'sequence_pair', 'steel_plate', 'straight_flush')
+# 可选牌型, 只有部分版本允许: 三带一, 四带一对, 飞机 (两个以上相连的三张, 每个三张带一张或一对)
+OPTIONAL_COMBOS = ('trio_single', 'four_pair', 'airplane')
+
+
+class Ruleset:
+    def __init__(self, id, name, decks, hand_size, order, runs, wild, combos, level=None):
+        self.id = id                # 回放文件里记录的编号
+        self.name = name
+        self.decks = decks
+        self.hand_size = hand_size
+        self.wild = wild
+        self.combos = frozenset(combos)
+        self.level = level          # 级牌的点数下标, None 是不分级牌的基础顺序
+        if level is not None:
+            # 级牌大于其他数字牌, 小于大小王; 任意牌就是红桃级牌, 单出/对出时和级牌一样大
+            rank = CARD_TYPES[level]
+            order = [r for r in order if r not in (rank, WILD_RANK, 'S', 'X')] + [rank, 'S', 'X']
+        self.order = tuple(order)   # 点数从小到大, 含任意牌 'R' 时它的位置就是单出/对出任意牌的大小
+        self.card_values = {rank: i for i, rank in enumerate(self.order)}
+        # 点数下标 -> 比较用的大小; 任意牌没有点数下标, 大小单独记
+        self.power = [self.card_values[rank] for rank in CARD_TYPES]
+        if level is None:
+            self.wild_power = self.card_values.get(WILD_RANK)
+        else:
+            self.wild_power = self.power[level] if wild else None
+        # 能组成顺子/连对/钢板/同花顺的点数, 按连牌的顺序; run_position 是点数下标在其中的位置, 不能连的为 None
+        self.run_order = [RANK_INDEX[rank] for rank in runs]
+        self.run_position = [None] * len(CARD_TYPES)
+        for i, r in enumerate(self.run_order):
+            self.run_position[r] = i
+        self.deck_size = len(DECK) * decks
+        # 13 种级牌各一张顺序表, 启动时一次算好; 开局后牌型识别和比较都用当局级牌的那一张
+        self.base = self
+        self.levels = None
+        if level is None:
+            self.levels = [Ruleset(id, name, decks, hand_size, order, runs, wild, combos, i) for i in range(NUM_RANKS)]
+            for table in self.levels:
+                table.base = self
+
+    def at_level(self, rank_card):
+        return self.base.levels[RANK_INDEX[rank_card]]
+
+    def __repr__(self):
+        if self.level is None:
+            return f"Ruleset({self.name!r})"
+        return f"Ruleset({self.name!r}, level={CARD_TYPES[self.level]!r})"
+
+
+NUMBERS = ['3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+
+# 两副牌, 每人 25 张, 2 最小, 红桃级牌当任意牌 (大于 A, 小于大小王), 两对王是四大天王
+SHISHAN = Ruleset(0, 'shishan', decks=2, hand_size=25,
+                  order=['2'] + NUMBERS + [WILD_RANK, 'S', 'X'], runs=['2'] + NUMBERS, wild=True,
+                  combos=GROUP_COMBOS + RUN_COMBOS + ('four_kings',))
+
+# 一副牌, 每人 13 张, 3 最小 2 最大, 2 不能连, 大小王一起是火箭
+GDPT = Ruleset(1, 'gdpt', decks=1, hand_size=13,
+               order=NUMBERS + ['2', 'S', 'X'], runs=NUMBERS, wild=False,
+               combos=GROUP_COMBOS + RUN_COMBOS + ('rocket',))
+
+# 同上, 但红桃级牌换成任意牌 'R', 单出时排在 2 和小王之间
+GDPT_WILD = Ruleset(2, 'gdpt_wild', decks=1, hand_size=13,
+                    order=NUMBERS + ['2', WILD_RANK, 'S', 'X'], runs=NUMBERS, wild=True,
+                    combos=GROUP_COMBOS + RUN_COMBOS + ('rocket',))
+
+# 同上, 再加上三带一, 四带一对和飞机
+GDPT_WILD_EXTRA = Ruleset(3, 'gdpt_wild_extra', decks=1, hand_size=13,
+                          order=NUMBERS + ['2', WILD_RANK, 'S', 'X'], runs=NUMBERS, wild=True,
+                          combos=GROUP_COMBOS + RUN_COMBOS + OPTIONAL_COMBOS + ('rocket',))
+
+RULESETS = [SHISHAN, GDPT, GDPT_WILD, GDPT_WILD_EXTRA]
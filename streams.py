@@ -0,0 +1,52 @@
+# /play 的 SSE 消息, Flask 和 ASGI 服务共用: 每走一回合产生一条消息, 回合之间的停顿由调用方决定
+import json
+
+from metrics import metrics, timed_dumps
+
+TURN_DELAY = 1  # 秒, 每回合之间停顿1秒,方便观看
+
+
+def sse(data):
+    return f"data: {data}\n\n"
+
+
+def game_events(game, delta=False):
+    if not delta:
+        game_state = game.get_game_state()
+        while not game_state['game_over']:
+            game.play_turn()
+            metrics.inc('turns')
+            game_state = game.get_game_state()
+            yield sse(timed_dumps(json.dumps, game_state))
+        yield sse(timed_dumps(json.dumps, game_state))
+        return
+
+    # 先发一次完整状态, 之后每回合只发增量
+    game_state = game.get_game_state()
+    game_state['type'] = 'snapshot'
+    yield sse(timed_dumps(json.dumps, game_state))
+    log_start = len(game.game_log)
+    while not game.game_over:
+        game.play_turn()
+        metrics.inc('turns')
+        yield sse(timed_dumps(json.dumps, game.get_state_delta(log_start)))
+        log_start = len(game.game_log)
+    yield sse('GAME_OVER')
+
+
+def metered_events(game, delta=False):
+    # 带指标的 game_events: 统计连接数和每个连接发出的字节数, 牌局各阶段的耗时记到当前线程的计时器上;
+    # 推送结束后换回原来的计时器, 别的线程之后调用 get_game_state 时不会写进这个线程的分片
+    timer = game.timer
+    game.timer = metrics.timer()
+    metrics.inc('streams_opened')
+    sent = 0
+    try:
+        for event in game_events(game, delta):
+            sent += len(event.encode())
+            yield event
+    finally:
+        game.timer = timer
+        metrics.inc('streams_closed')
+        metrics.inc('stream_bytes', sent)
+        metrics.observe_size('stream_bytes', sent)
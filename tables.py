@@ -0,0 +1,89 @@
+# 多桌会话表: 按桌号创建/查找牌局, 闲置太久或超出内存预算的桌子会被回收
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from movelog import MoveLog
+
+TABLE_BASE_BYTES = 32 * 1024    # 一桌牌局(四手牌, 牌堆, 玩家对象)的粗略内存占用
+DEFAULT_IDLE_TIMEOUT = 30 * 60  # 秒
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+EVICT_INTERVAL = 10             # 秒; 查找桌子时最多这么久回收一次, 没有新开桌子时闲置的桌子也会被回收
+
+
+def estimate_bytes(game):
+    # 只做粗略估计: 固定开销 + 游戏记录的长度; 二进制记录按字节数算, 再加上 get_game_state 渲染过的文本缓存
+    if isinstance(game.game_log, MoveLog):
+        text = game.game_log.text
+        return TABLE_BASE_BYTES + game.game_log.nbytes + sys.getsizeof(text) + sum(sys.getsizeof(line) for line in text)
+    return TABLE_BASE_BYTES + sum(len(line) for line in game.game_log) * 2
+
+
+class TableRegistry:
+    def __init__(self, factory, idle_timeout=DEFAULT_IDLE_TIMEOUT, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.memory_budget = memory_budget
+        self.tables = OrderedDict()   # 桌号 -> [game, 最后使用时间], 按最近使用排序
+        self.lock = threading.Lock()
+        self.last_evict = time.monotonic()
+
+    def __len__(self):
+        return len(self.tables)
+
+    def new_table_id(self):
+        return uuid.uuid4().hex[:12]
+
+    def create(self, table_id=None):
+        table_id = table_id or self.new_table_id()
+        game = self.factory()
+        with self.lock:
+            self.tables[table_id] = [game, time.monotonic()]
+            self.tables.move_to_end(table_id)
+            self._evict()
+        return table_id, game
+
+    def get(self, table_id):
+        with self.lock:
+            entry = self.tables.get(table_id)
+            if entry is None:
+                return None
+            entry[1] = now = time.monotonic()
+            self.tables.move_to_end(table_id)
+            if now - self.last_evict >= EVICT_INTERVAL:
+                self._evict()
+            return entry[0]
+
+    def get_or_create(self, table_id):
+        game = self.get(table_id) if table_id else None
+        if game is None:
+            table_id, game = self.create(table_id)
+        return table_id, game
+
+    def touch(self, table_id):
+        self.get(table_id)
+
+    def remove(self, table_id):
+        with self.lock:
+            self.tables.pop(table_id, None)
+
+    def evict(self):
+        with self.lock:
+            return self._evict()
+
+    def _evict(self):
+        # 先回收闲置超时的桌子, 再按最久未使用的顺序回收, 直到低于内存预算; 最新的一桌总是保留
+        evicted = []
+        now = self.last_evict = time.monotonic()
+        for table_id, (game, last_used) in list(self.tables.items())[:-1]:
+            if now - last_used > self.idle_timeout:
+                del self.tables[table_id]
+                evicted.append(table_id)
+        total = sum(estimate_bytes(game) for game, last_used in self.tables.values())
+        while total > self.memory_budget and len(self.tables) > 1:
+            table_id, (game, last_used) = self.tables.popitem(last=False)
+            total -= estimate_bytes(game)
+            evicted.append(table_id)
+        return evicted
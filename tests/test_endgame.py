@@ -0,0 +1,33 @@
+# 置换表只是缓存: 带置换表和不带置换表搜出来的胜负必须一样
+import pytest
+
+from endgame import EndgameSolver, cards_left
+from engine import Game
+from rules import SHISHAN, GDPT
+
+ENDGAME = 24
+MAX_NODES = 200000
+
+
+class NoTable(dict):
+    # 什么都不存的置换表, 每个局面都重新搜
+    def __setitem__(self, key, value):
+        pass
+
+
+@pytest.mark.parametrize('rules', [SHISHAN, GDPT], ids=lambda rules: rules.name)
+@pytest.mark.parametrize('seed', range(6))
+def test_table_does_not_change_result(rules, seed):
+    game = Game(seed=seed, rules=rules)
+    while not game.game_over and cards_left(game) > ENDGAME:
+        game.play_turn()
+    if game.game_over:
+        pytest.skip('game ended before the endgame')
+
+    cached = EndgameSolver(max_nodes=MAX_NODES).solve(game)
+    plain = EndgameSolver(max_nodes=MAX_NODES)
+    plain.table = NoTable()
+    uncached = plain.solve(game)
+    if cached is None or uncached is None:
+        pytest.skip('position too large for the node budget')
+    assert cached[0] == uncached[0]
@@ -0,0 +1,36 @@
+# 出法枚举: 允许任意牌时只会多出法, 不会少
+import pytest
+
+from cards import CARDS, SMALL_JOKER, WILD_CARD
+from engine import Game
+from hand import Hand
+from moves import legal_moves, classify, take
+from rules import RULESETS
+
+
+@pytest.mark.parametrize('rules', RULESETS, ids=lambda rules: rules.name)
+def test_wild_moves_include_natural_moves(rules):
+    for seed in range(40):
+        game = Game(seed=seed, rules=rules)
+        for player in game.players:
+            natural = set(legal_moves(player.hand, wild=False, rules=game.ranking))
+            assert natural <= set(legal_moves(player.hand, wild=True, rules=game.ranking))
+
+
+def test_joker_bombs_with_wild_in_hand():
+    small, big = CARDS[SMALL_JOKER * 4], CARDS[SMALL_JOKER * 4 + 1]
+    hand = Hand([small, small, big, big, CARDS[0], WILD_CARD])
+    for rules in RULESETS:
+        natural = {m for m in legal_moves(hand, rules=rules) if m.type in ('four_kings', 'rocket')}
+        assert natural
+        assert natural <= set(legal_moves(hand, wild=True, rules=rules))
+
+
+@pytest.mark.parametrize('rules', RULESETS, ids=lambda rules: rules.name)
+def test_moves_round_trip_through_take(rules):
+    # 每个列出来的出法, 取出具体的牌再识别, 要得到同一个出法 (比如顺子不能取成同花顺)
+    for seed in range(150):
+        game = Game(seed=seed, rules=rules)
+        for player in game.players:
+            for move in legal_moves(player.hand, wild=True, rules=game.ranking):
+                assert classify(take(player.hand, move), game.ranking) == move
@@ -0,0 +1,43 @@
+# 回放的每一帧都要和实际对局中同一回合的状态一致, 包括存盘再读回来之后
+import pytest
+
+from engine import Game
+from replay import Replay
+from rules import RULESETS
+
+
+@pytest.mark.parametrize('rules', RULESETS, ids=lambda rules: rules.name)
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_frames_match_live_states(rules, seed):
+    game = Game(seed=seed, rules=rules)
+    states = [game.get_game_state()]
+    while not game.game_over:
+        game.play_turn()
+        states.append(game.get_game_state())
+
+    replay = Replay.from_game(game, interval=4)
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert len(replay) == len(states)
+    for turn, state in enumerate(states):
+        assert replay.frame(turn) == state
+        assert loaded.frame(turn) == state
+
+
+def test_frames_match_with_passes_on_empty_table():
+    # 只有 3 号座位会首家出牌, 其他人轮到首家时pass: 桌面上没有牌时的pass不算进一轮的pass数, 回放要和实际对局一样处理
+    def only_seat_3_leads(game, player):
+        if not game.last_played_cards and player.position != 3:
+            return []
+        return game.choose_cards(player)
+
+    game = Game(seed=3)
+    game.bots = [only_seat_3_leads] * 4
+    states = [game.get_game_state()]
+    for turn in range(300):
+        if game.game_over:
+            break
+        game.play_turn()
+        states.append(game.get_game_state())
+
+    replay = Replay.from_game(game)
+    assert [replay.frame(turn) for turn in range(len(replay))] == states
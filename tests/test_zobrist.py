@@ -0,0 +1,37 @@
+# 增量维护的 Zobrist 哈希要和从头重新计算的一致: 每回合出牌, pass 和一轮结束清桌之后都对一遍
+import pytest
+
+from cards import CARD_TYPES
+from engine import Game
+from rules import RULESETS
+from zobrist import HAND_KEYS, TURN_KEYS, LEVEL_KEYS, cards_hash
+
+
+def full_hash(game):
+    h = TURN_KEYS[game.current_player] ^ LEVEL_KEYS[CARD_TYPES.index(game.rank_card)] ^ cards_hash(game.last_played_cards)
+    for player in game.players:
+        h ^= cards_hash(player.hand, HAND_KEYS[player.position])
+    return h
+
+
+@pytest.mark.parametrize('rules', RULESETS, ids=lambda rules: rules.name)
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_incremental_hash_matches_full_hash(rules, seed):
+    game = Game(seed=seed, rules=rules)
+    assert game.zobrist == full_hash(game)
+    while not game.game_over:
+        game.play_turn()
+        assert game.zobrist == full_hash(game)
+
+
+def test_hash_restored_after_undo():
+    # 搜索里出牌后再把牌放回去, 哈希要回到原来的值, 和牌在列表里的顺序无关
+    game = Game(seed=0)
+    before = game.zobrist
+    for player in game.players:
+        played = [player.hand[0], player.hand[-1]]
+        for card in played:
+            player.hand.remove(card)
+        assert game.zobrist != before
+        player.hand.extend(reversed(played))
+    assert game.zobrist == before
@@ -0,0 +1,114 @@
+# 多进程自我对局: 把带种子的牌局分给进程池并行跑, 边跑边汇总各座位和各队(0/2 对 1/3)的胜率
+import argparse
+import importlib
+import math
+import multiprocessing
+import time
+
+from engine import MAX_TURNS, game_seeds, run_seeded
+
+
+def load_bot(spec):
+    # 'module:function' 形式的出牌函数, 'default' 表示用 Game.choose_cards
+    if not spec or spec == 'default':
+        return None
+    module, name = spec.split(':')
+    bot = importlib.import_module(module)
+    for attr in name.split('.'):
+        bot = getattr(bot, attr)
+    return bot
+
+
+def _run_chunk(args):
+    seeds, bot_specs, max_turns = args
+    bots = [load_bot(spec) for spec in bot_specs] if bot_specs else None
+    return [run_seeded(seed, bots, max_turns) for seed in seeds]
+
+
+def wilson_interval(wins, n, z=1.96):
+    # 胜率的 Wilson 置信区间, 默认 95%
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class TournamentStats:
+    def __init__(self):
+        self.games = 0
+        self.unfinished = 0
+        self.turns = 0
+        self.seat_wins = [0, 0, 0, 0]
+        self.team_wins = [0, 0]
+
+    def add(self, result):
+        self.games += 1
+        self.turns += result['turns']
+        if result['winner'] is None:
+            self.unfinished += 1
+        else:
+            self.seat_wins[result['winner']] += 1
+            self.team_wins[result['team']] += 1
+
+    def summary(self):
+        return {
+            'games': self.games,
+            'unfinished': self.unfinished,
+            'avg_turns': self.turns / self.games if self.games else 0.0,
+            'seats': [self._rate(wins) for wins in self.seat_wins],
+            'teams': [self._rate(wins) for wins in self.team_wins]
+        }
+
+    def _rate(self, wins):
+        low, high = wilson_interval(wins, self.games)
+        return {'wins': wins, 'rate': wins / self.games if self.games else 0.0, 'ci': (low, high)}
+
+
+def run_tournament(n_games, seed=None, bot_specs=None, workers=None, chunk_size=50,
+                   max_turns=MAX_TURNS, on_result=None):
+    # bot_specs: 四个座位的 'module:function' (或 None), 在每个工作进程里各自导入
+    seeds = game_seeds(n_games, seed)
+    chunks = [(seeds[i:i + chunk_size], bot_specs, max_turns) for i in range(0, len(seeds), chunk_size)]
+    stats = TournamentStats()
+    with multiprocessing.Pool(workers) as pool:
+        for results in pool.imap_unordered(_run_chunk, chunks):
+            for result in results:
+                stats.add(result)
+                if on_result:
+                    on_result(result)
+    return stats
+
+
+def print_summary(summary, elapsed):
+    print(f"{summary['games']} games in {elapsed:.1f}s "
+          f"({summary['games'] / elapsed:.0f} games/s), avg {summary['avg_turns']:.1f} turns, "
+          f"{summary['unfinished']} unfinished")
+    for i, seat in enumerate(summary['seats']):
+        low, high = seat['ci']
+        print(f"  seat {i}: {seat['rate']:.3f}  [{low:.3f}, {high:.3f}]")
+    for i, team in enumerate(summary['teams']):
+        low, high = team['ci']
+        print(f"  team {i}/{i + 2}: {team['rate']:.3f}  [{low:.3f}, {high:.3f}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多进程自我对局')
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='进程数, 默认使用全部CPU')
+    parser.add_argument('--chunk', type=int, default=50, help='每个任务包含的局数')
+    parser.add_argument('--bots', default=None, help="四个座位的出牌函数, 逗号分隔, 如 'default,mybot:play,default,mybot:play'")
+    args = parser.parse_args()
+
+    bot_specs = args.bots.split(',') if args.bots else None
+    if bot_specs and len(bot_specs) != 4:
+        parser.error('--bots 需要四个座位')
+    start = time.perf_counter()
+    stats = run_tournament(args.games, args.seed, bot_specs, args.workers, args.chunk)
+    print_summary(stats.summary(), time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
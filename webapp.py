@@ -0,0 +1,66 @@
+# Flask 前端: 所有版本共用同一套路由, 只是开局用的规则表 (rules.py) 不同;
+# gdpt.py, shishan.py 等入口文件只调用 create_app(规则)
+from flask import Flask, render_template, request, jsonify, Response, abort
+import os
+import time
+from engine import Game
+from replay import Replay, ReplayStore
+from metrics import metrics
+from streams import TURN_DELAY, metered_events
+from tables import TableRegistry
+
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'replays')
+
+
+def create_app(rules):
+    app = Flask(__name__)
+    app.config['RULES'] = rules
+
+    tables = TableRegistry(lambda: Game(rules=rules))  # 每张桌子一局游戏, 按桌号区分不同的浏览器
+    replays = ReplayStore(REPLAY_DIR)
+
+    @app.route('/')
+    def index():
+        table_id, game = tables.get_or_create(request.args.get('table'))
+        game.reset_game()
+        return render_template('index.html', game_state=game.get_game_state(), table_id=table_id)
+
+    @app.route('/play')
+    def play():
+        table_id = request.args.get('table')
+        game = tables.get(table_id)
+        if game is None:
+            abort(404)
+        delta = request.args.get('delta') == '1'
+
+        def generate():
+            for event in metered_events(game, delta):
+                tables.touch(table_id)
+                yield event
+                if not game.game_over:
+                    time.sleep(TURN_DELAY)
+
+        return Response(generate(), mimetype='text/event-stream')
+
+    @app.route('/replay')
+    def replay():
+        # 回放: 按回放 id, 或者按桌号取这桌刚结束的一局, 返回第 turn 回合的状态
+        replay_id = request.args.get('id')
+        if replay_id:
+            game_replay = replays.get(replay_id)
+        else:
+            game = tables.get(request.args.get('table'))
+            if game is None or not game.game_over:
+                abort(404)
+            game_replay = Replay.from_game(game)
+            replay_id = replays.put(game_replay)
+        if game_replay is None:
+            abort(404)
+        turn = max(0, min(request.args.get('turn', 0, type=int), len(game_replay) - 1))
+        return jsonify({'id': replay_id, 'turn': turn, 'turns': len(game_replay) - 1, 'state': game_replay.frame(turn)})
+
+    @app.route('/metrics')
+    def metrics_text():
+        return Response(metrics.render([('active_tables', len(tables))]), mimetype='text/plain; version=0.0.4')
+
+    return app
@@ -0,0 +1,32 @@
+# Zobrist 哈希表: 每个 (座位, 牌 id, 第几张) 一个 64 位随机数, 手牌里加减一张牌只需异或一次;
+# 轮到谁出牌, 桌面上的牌和级牌各有一组随机数; 种子固定, 不同进程算出的哈希相同
+import random
+
+from cards import CARDS, NUM_RANKS
+
+MAX_COPIES = 2      # 两副牌, 同一张牌最多两张
+SEATS = 4
+
+_rng = random.Random(0x9E3779B97F4A7C15)
+
+
+def _keys(*shape):
+    if len(shape) == 1:
+        return [_rng.getrandbits(64) for i in range(shape[0])]
+    return [_keys(*shape[1:]) for i in range(shape[0])]
+
+
+HAND_KEYS = _keys(SEATS, len(CARDS), MAX_COPIES)
+TABLE_KEYS = _keys(len(CARDS), MAX_COPIES)       # 桌面上最后打出的牌
+TURN_KEYS = _keys(SEATS)
+LEVEL_KEYS = _keys(NUM_RANKS)
+
+
+def cards_hash(cards, keys=TABLE_KEYS):
+    h = 0
+    seen = {}
+    for card in cards:
+        n = seen.get(card.id, 0)
+        h ^= keys[card.id][n]
+        seen[card.id] = n + 1
+    return h